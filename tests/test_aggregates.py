@@ -0,0 +1,98 @@
+"""Tests for aggregates.py."""
+
+import random
+
+import pytest
+
+from vegehub.aggregates import BucketSeries, RollingWindow, SensorAggregator
+from vegehub.helpers import update_data_to_ha_dict
+from .test_helpers import UPDATE_DATA
+
+MAC = "7C9EBD4B49D8"
+
+
+def test_rolling_window_matches_rescan():
+    """Test the incremental stats against a brute force rescan."""
+    rng = random.Random(1)
+    window = RollingWindow(50)
+    history = []
+    for timestamp in range(0, 500, 3):
+        value = rng.uniform(0, 3)
+        window.add(timestamp, value)
+        history.append((timestamp, value))
+        current = [v for t, v in history if t > timestamp - 50]
+        assert window.count == len(current)
+        assert window.min == min(current)
+        assert window.max == max(current)
+        assert window.mean == pytest.approx(sum(current) / len(current))
+
+
+def test_rolling_window_rate():
+    """Test the rate of change across the window."""
+    window = RollingWindow(100)
+    assert window.rate is None
+    assert window.mean is None
+    window.add(0, 10.0)
+    window.add(50, 20.0)
+    assert window.rate == pytest.approx(0.2)
+    window.add(100, 0.0)
+    assert window.as_dict() == {
+        "count": 2,
+        "min": 0.0,
+        "max": 20.0,
+        "mean": 10.0,
+        "rate": -0.4
+    }
+
+
+def test_late_samples():
+    """Test that late samples are kept out of windows but still bucketed."""
+    window = RollingWindow(100)
+    window.add(100, 5.0)
+    with pytest.raises(ValueError):
+        window.add(50, 1.0)
+    window.add(160, 7.0)
+    assert (window.count, window.min, window.max) == (2, 5.0, 7.0)
+
+    aggregator = SensorAggregator(windows=(100,), bucket_seconds=60)
+    aggregator.add(MAC, "analog_0", 100, 5.0)
+    aggregator.add(MAC, "analog_0", 50, 1.0)
+    aggregator.add(MAC, "analog_0", 160, 7.0)
+    window = aggregator.window(MAC, "analog_0", 100)
+    assert (window.count, window.min, window.max) == (2, 5.0, 7.0)
+    assert aggregator.late_samples == 1
+    buckets = aggregator.series(MAC, "analog_0").buckets
+    assert [(b.start, b.count) for b in buckets] == [(60, 1), (120, 1)]
+
+
+def test_bucket_series():
+    """Test downsampling into fixed buckets."""
+    series = BucketSeries(seconds=60, max_buckets=2)
+    series.add(0, 1.0)
+    series.add(30, 3.0)
+    series.add(65, 5.0)
+    series.add(59, 2.0)
+    assert [(b.start, b.min, b.max, b.count) for b in series.buckets] == [
+        (0, 1.0, 3.0, 3), (60, 5.0, 5.0, 1)
+    ]
+    assert series.buckets[0].mean == 2.0
+    series.add(130, 7.0)
+    assert [b.start for b in series.buckets] == [60, 120]
+    assert series.latest.mean == 7.0
+
+
+def test_sensor_aggregator_update():
+    """Test feeding decoded updates into the aggregator."""
+    aggregator = SensorAggregator(windows=(3600,), bucket_seconds=3600)
+    values = update_data_to_ha_dict(UPDATE_DATA, 4, 2, False)
+    aggregator.update(MAC, values, UPDATE_DATA["send_time"])
+    aggregator.update(MAC, {"analog_0": 2.5}, UPDATE_DATA["send_time"] + 60)
+
+    window = aggregator.window(MAC, "analog_0", 3600)
+    assert window.min == 1.5
+    assert window.max == 2.5
+    assert window.mean == 2.0
+    assert aggregator.series(MAC, "battery").latest.count == 1
+    assert (MAC.lower(), "actuator_1") in aggregator.entities()
+    assert aggregator.window(MAC, "analog_0", 60) is None
+    assert aggregator.window(MAC, "analog_9", 3600) is None
@@ -0,0 +1,118 @@
+"""Tests for audit.py."""
+
+import asyncio
+
+import pytest
+
+from vegehub.audit import (ConfigAudit, config_drift, config_fingerprint,
+                           group_by_fingerprint, normalize_config)
+from vegehub.fleet import VegeHubFleet
+from vegehub.transport import InProcessTransport, SimulatedHub
+from vegehub.vegehub import VegeHub
+
+EXPECTED = {"api_key": "key", "hub": {"server_url": "http://server/api"}}
+
+
+def test_normalize_config():
+    """Test flattening and normalizing equivalent configs."""
+    flat = normalize_config({
+        "api_key": " key ",
+        "hub": {"server_url": "HTTP://Server/api/", "server_type": 3},
+    })
+    assert flat == {
+        "api_key": "key",
+        "hub.server_url": "http://server/api",
+        "hub.server_type": 3,
+    }
+    assert config_fingerprint({"api_key": "key", "hub": {
+        "server_url": "http://server/api"}}) == config_fingerprint({
+            "hub": {"server_url": "http://SERVER/api/"}, "api_key": "key"})
+
+
+def test_config_drift():
+    """Test that only template keys that differ are reported."""
+    config = {"api_key": "old", "hub": {"server_type": 3}}
+    assert config_drift(config, EXPECTED) == {
+        "api_key": ("key", "old"),
+        "hub.server_url": ("http://server/api", None),
+    }
+    assert not config_drift(
+        {"api_key": "key", "hub": {"server_url": "http://server/api/"}},
+        EXPECTED)
+
+
+@pytest.fixture(name="simulated")
+def fixture_simulated():
+    """A fleet of simulated hubs, half of them configured as expected."""
+    transport = InProcessTransport()
+    devices = []
+    hubs = []
+    for number in range(20):
+        host = f"10.0.0.{number}"
+        device = SimulatedHub(f"7C:9E:BD:00:00:{number:02X}")
+        if number % 2:
+            device.config = {
+                "api_key": "key",
+                "hub": {"server_url": "http://server/api", "server_type": 3},
+            }
+        transport.add_host(host, device)
+        devices.append(device)
+        hubs.append(VegeHub(host, mac_address=f"7C9EBD0000{number:02X}",
+                            transport=transport))
+    return transport, devices, VegeHubFleet(hubs)
+
+
+@pytest.mark.asyncio
+async def test_audit_fleet(simulated):
+    """Test auditing a fleet, reusing configs within the TTL."""
+    transport, devices, fleet = simulated
+    audit = ConfigAudit(fleet, EXPECTED, concurrency=4)
+    report = await audit.run()
+    assert len(report) == 20
+    assert report["7C9EBD000001"].ok
+    assert report["7C9EBD000000"].drift == {
+        "api_key": ("key", ""),
+        "hub.server_url": ("http://server/api", ""),
+    }
+    groups = group_by_fingerprint(report)
+    assert sorted(len(keys) for keys in groups.values()) == [10, 10]
+    assert transport.requests == 20
+
+    report = await audit.run()
+    assert all(result.cached for result in report.values())
+    assert transport.requests == 20
+    assert audit.cache_hits == 20
+
+    hub = fleet.get("7C9EBD000000")
+    await hub.setup("key", "http://server/api")
+    audit.invalidate(hub)
+    report = await audit.run()
+    assert report["7C9EBD000000"].ok
+    assert not report["7C9EBD000000"].cached
+    assert devices[0].config["api_key"] == "key"
+
+
+@pytest.mark.asyncio
+async def test_audit_bounded_and_errors(simulated):
+    """Test that parallelism is bounded and failures are reported."""
+    transport, _, fleet = simulated
+    running = 0
+    peak = 0
+
+    async def slow(method, path, payload):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return 500, None
+
+    for number in range(20):
+        transport.add_host(f"10.0.0.{number}", slow)
+    audit = ConfigAudit(fleet, EXPECTED, concurrency=3, ttl=0)
+    report = await audit.run()
+    assert peak == 3
+    assert all(isinstance(result.error, ConnectionError)
+               for result in report.values())
+    assert group_by_fingerprint(report) == {"error": list(report)}
+    assert audit.fetches == 20
@@ -0,0 +1,72 @@
+"""Tests for batch.py."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from vegehub.batch import async_decode_batch, decode_batch
+from vegehub.helpers import update_data_to_ha_dict, vh400_transform
+from .test_helpers import UPDATE_DATA, UPDATE_DATA_2
+
+PAYLOADS = [UPDATE_DATA, UPDATE_DATA_2, {}] * 10
+TRANSFORMS = {"analog_0": vh400_transform}
+
+
+def expected_results():
+    """Decode the payloads one by one for comparison."""
+    results = []
+    for data in PAYLOADS:
+        decoded = update_data_to_ha_dict(data, 4, 2, False)
+        if "analog_0" in decoded:
+            decoded["analog_0"] = vh400_transform(decoded["analog_0"])
+        results.append(decoded)
+    return results
+
+
+def test_decode_batch_in_process():
+    """Test that small batches are decoded in order without a pool."""
+    assert decode_batch(PAYLOADS, 4, 2, False, TRANSFORMS) == expected_results()
+
+
+def test_decode_batch_process_pool():
+    """Test decoding across worker processes keeps input order."""
+    results = decode_batch(PAYLOADS,
+                           4,
+                           2,
+                           False,
+                           TRANSFORMS,
+                           max_workers=2,
+                           chunk_size=4,
+                           min_parallel=0)
+    assert results == expected_results()
+
+
+def test_decode_batch_given_executor():
+    """Test decoding with a caller supplied executor."""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = decode_batch(PAYLOADS,
+                               4,
+                               2,
+                               False,
+                               TRANSFORMS,
+                               executor=executor,
+                               chunk_size=7,
+                               min_parallel=0)
+    assert results == expected_results()
+
+
+@pytest.mark.asyncio
+async def test_async_decode_batch():
+    """Test the asyncio wrapper for both small and pooled batches."""
+    assert await async_decode_batch(PAYLOADS, 4, 2, False,
+                                    TRANSFORMS) == expected_results()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = await async_decode_batch(PAYLOADS,
+                                           4,
+                                           2,
+                                           False,
+                                           TRANSFORMS,
+                                           executor=executor,
+                                           chunk_size=5,
+                                           min_parallel=0)
+    assert results == expected_results()
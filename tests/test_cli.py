@@ -0,0 +1,133 @@
+"""Tests for cli.py."""
+
+import asyncio
+import io
+import json
+
+import pytest
+from aioresponses import aioresponses
+
+from vegehub import cli
+from vegehub.cli import build_parser, expand_hosts, main, run_command
+from .test_vegehub import (ACTUATOR_INFO_PAYLOAD, HUB_INFO_PAYLOAD,
+                           TEST_MAC_SHORT, WIFI_INFO_PAYLOAD)
+
+
+def test_expand_hosts():
+    """Test expanding single hosts, ranges and comments."""
+    hosts = list(
+        expand_hosts([
+            "192.168.0.100", " hub.local ", "10.0.0.0/30", "10.0.1.5/32",
+            "# comment", ""
+        ]))
+    assert hosts == [
+        "192.168.0.100", "hub.local", "10.0.0.1", "10.0.0.2", "10.0.1.5"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_run_command_streams_results():
+    """Test that results are written as each hub finishes."""
+    args = build_parser().parse_args(["actuator-status", "-t", "0.05"])
+    output = io.StringIO()
+    with aioresponses() as mocked:
+        mocked.get("http://10.0.0.1/api/actuators/status",
+                   payload=ACTUATOR_INFO_PAYLOAD)
+        mocked.get("http://10.0.0.2/api/actuators/status", status=500)
+
+        async def slow(_url, **_kwargs):
+            await asyncio.sleep(1)
+
+        mocked.get("http://10.0.0.3/api/actuators/status", callback=slow)
+        succeeded, failed = await run_command(
+            cli.COMMANDS["actuator-status"],
+            ["10.0.0.3", "10.0.0.1", "10.0.0.2"],
+            args,
+            concurrency=3,
+            timeout=0.05,
+            output=output)
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert (succeeded, failed) == (1, 2)
+    assert [result["hub"] for result in results] == [
+        "10.0.0.1", "10.0.0.2", "10.0.0.3"
+    ]
+    assert results[0]["result"][0]["slot"] == 0
+    assert results[1]["error"] == "ConnectionError"
+    assert results[2]["error"] == "timed out"
+
+
+def test_main_info_and_mac(capsys, tmp_path):
+    """Test the info and mac commands end to end."""
+    hosts = tmp_path / "hosts.txt"
+    hosts.write_text("192.168.0.100\n")
+    with aioresponses() as mocked:
+        mocked.post("http://192.168.0.100/api/info/get",
+                    payload=HUB_INFO_PAYLOAD)
+        assert main(["info", "-f", str(hosts)]) == 0
+        mocked.post("http://192.168.0.100/api/info/get",
+                    payload=WIFI_INFO_PAYLOAD)
+        assert main(["mac", "192.168.0.100"]) == 0
+    info, mac = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert info["result"]["info"] == HUB_INFO_PAYLOAD["hub"]
+    assert info["result"]["mac"] == TEST_MAC_SHORT
+    assert mac["result"] == TEST_MAC_SHORT
+
+
+def test_main_bad_targets(capsys):
+    """Test that bad or missing targets are rejected before any request."""
+    with aioresponses() as mocked:
+        for argv in (["info", "10.0.0.300/24"], [
+                "set-actuator", "10.0.0.1", "bad/24", "--slot", "0",
+                "--state", "1", "--duration", "60"
+        ], ["info"], ["info", "# only a comment"]):
+            with pytest.raises(SystemExit) as exit_info:
+                main(argv)
+            assert exit_info.value.code == 2
+        assert not mocked.requests
+    captured = capsys.readouterr()
+    assert not captured.out
+    assert "does not appear to be an IPv4 or IPv6 network" in captured.err
+    assert "no hosts given" in captured.err
+
+
+def test_main_set_actuator(capsys):
+    """Test set-actuator, and a failing exit code."""
+    with aioresponses() as mocked:
+        mocked.post("http://192.168.0.100/api/actuators/set")
+        mocked.post("http://192.168.0.101/api/actuators/set", status=400)
+        assert main([
+            "set-actuator", "192.168.0.100", "192.168.0.101", "--slot", "0",
+            "--state", "1", "--duration", "60"
+        ]) == 1
+        calls = list(mocked.requests.values())
+    assert calls[0][0].kwargs["json"] == {
+        "target": 0,
+        "duration": 60,
+        "state": 1
+    }
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(result["ok"] for result in results) == [False, True]
+
+
+
+def test_main_false_results_fail(capsys, monkeypatch):
+    """Test that setup and request-update report a False result as failed."""
+
+    async def not_applied(*_args, **_kwargs):
+        return False
+
+    monkeypatch.setattr(cli.VegeHub, "setup", not_applied)
+    monkeypatch.setattr(cli.VegeHub, "request_update", not_applied)
+    assert main([
+        "setup", "192.168.0.100", "--api-key", "key", "--server",
+        "http://server"
+    ]) == 1
+    assert main(["request-update", "192.168.0.100"]) == 1
+    setup, update = [
+        json.loads(line) for line in capsys.readouterr().out.splitlines()
+    ]
+    assert not setup["ok"]
+    assert setup["error"] == "ValueError: Config not applied"
+    assert not update["ok"]
+    assert update["error"] == "ValueError: Update not requested"
@@ -0,0 +1,69 @@
+"""Tests for dedupe.py."""
+
+from vegehub.dedupe import (SAMPLE_DUPLICATE, SAMPLE_LATE, SAMPLE_NEW,
+                            SampleFilter)
+from vegehub.helpers import update_data_to_ha_dict
+from .test_helpers import UPDATE_DATA, UPDATE_DATA_2
+
+
+def test_resent_update_is_dropped():
+    """Test that a re-sent update yields nothing new."""
+    sample_filter = SampleFilter()
+    fresh, late = sample_filter.filter_update(UPDATE_DATA)
+    assert fresh == UPDATE_DATA
+    assert not late
+
+    fresh, late = sample_filter.filter_update(UPDATE_DATA)
+    assert not fresh["sensors"]
+    assert not late
+    assert not update_data_to_ha_dict(fresh, 4, 2, False)
+    assert sample_filter.duplicates == 7
+    assert sample_filter.stale_payloads == 1
+
+
+def test_late_samples_are_flagged():
+    """Test that samples older than the high-water mark are reported."""
+    sample_filter = SampleFilter()
+    sample_filter.filter_update(UPDATE_DATA_2)
+    fresh, late = sample_filter.filter_update(UPDATE_DATA)
+    assert [sensor["slot"] for sensor in fresh["sensors"]] == [6, 7]
+    assert [slot for slot, _ in late] == [1, 2, 3, 4, 5]
+    assert sample_filter.late == 5
+    assert sample_filter.last_sample_time("7c9ebd4b49d8",
+                                          1) == "2025-05-16T20:38:40Z"
+    assert sample_filter.last_send_time("7C9EBD4B49D8") == 1747427920
+
+
+def test_mixed_samples_in_one_slot():
+    """Test per-sample filtering within a slot, and the send_time fallback."""
+    sample_filter = SampleFilter()
+    data = {
+        "mac": "7C9EBD4B49D8",
+        "send_time": 1736959883,
+        "sensors": [{
+            "slot": 1,
+            "samples": [{"v": 1, "t": "2025-01-15T16:50:00Z"},
+                        {"v": 2, "t": "2025-01-15T16:51:00Z"}]
+        }, {
+            "slot": 2,
+            "samples": [{"v": 3}]
+        }]
+    }
+    sample_filter.filter_update(data)
+    assert sample_filter.last_sample_time("7C9EBD4B49D8",
+                                          2) == "2025-01-15T16:51:23Z"
+    assert sample_filter.check("7C9EBD4B49D8", 1,
+                               "2025-01-15T16:51:00Z") == SAMPLE_DUPLICATE
+    assert sample_filter.check("7C9EBD4B49D8", 1,
+                               "2025-01-15T16:50:30Z") == SAMPLE_LATE
+    assert sample_filter.check("7C9EBD4B49D8", 1,
+                               "2025-01-15T16:52:00Z") == SAMPLE_NEW
+
+    sample_filter.forget("7c9ebd4b49d8")
+    assert sample_filter.last_sample_time("7C9EBD4B49D8", 1) is None
+    assert sample_filter.filter_update(data)[0] == data
+
+
+def test_not_an_update():
+    """Test that other payloads pass through untouched."""
+    assert SampleFilter().filter_update({}) == ({}, [])
@@ -0,0 +1,59 @@
+"""Tests for delta.py."""
+
+from vegehub.delta import DeltaDecoder
+from .test_helpers import UPDATE_DATA
+
+
+def update_with(values):
+    """Build a raw update with the given slot values."""
+    return {
+        "mac": "7C9EBD4B49D8",
+        "sensors": [{
+            "slot": slot,
+            "samples": [{
+                "v": value,
+                "t": "2025-01-15T16:51:23Z"
+            }]
+        } for slot, value in values.items()]
+    }
+
+
+def test_only_changes_are_returned():
+    """Test that repeated values are suppressed and counted."""
+    decoder = DeltaDecoder(4, 2, False)
+    first = decoder.decode(UPDATE_DATA)
+    assert len(first) == 7
+    assert not decoder.decode(UPDATE_DATA)
+    assert decoder.suppressed == 7
+
+    changed = decoder.decode(update_with({1: 1.6, 2: 1.45599997, 6: 0}))
+    assert changed == {"analog_0": 1.6, "actuator_0": 0}
+    assert decoder.suppressed_by_entity["analog_1"] == 2
+    assert decoder.emitted == 9
+    assert decoder.state["analog_0"] == 1.6
+
+
+def test_full_resync():
+    """Test full output and resync modes."""
+    decoder = DeltaDecoder(4, 2, False)
+    decoder.decode(UPDATE_DATA)
+    assert len(decoder.decode(UPDATE_DATA, full=True)) == 7
+    decoder.resync()
+    assert len(decoder.decode(UPDATE_DATA)) == 7
+
+
+def test_deadbands():
+    """Test absolute and relative deadbands against the last emitted value."""
+    decoder = DeltaDecoder(4,
+                           2,
+                           False,
+                           deadbands={"analog_0": 0.1},
+                           relative_deadbands={"battery": 0.05})
+    decoder.decode(update_with({1: 1.0, 5: 10.0}))
+    assert not decoder.decode(update_with({1: 1.05, 5: 10.4}))
+    assert not decoder.decode(update_with({1: 1.09, 5: 9.6}))
+    assert decoder.decode(update_with({1: 1.15, 5: 10.6})) == {
+        "analog_0": 1.15,
+        "battery": 10.6
+    }
+    assert decoder.suppressed == 4
@@ -0,0 +1,100 @@
+"""Tests for failure_log.py."""
+
+import asyncio
+import logging
+
+import pytest
+
+from vegehub.failure_log import FailureLog
+
+LOGGER = logging.getLogger("vegehub.test_failure_log")
+
+
+def test_repeats_are_summarized(caplog):
+    """Test that repeated failures are logged once, then summarized."""
+    failures = FailureLog(LOGGER, summary_interval=3600)
+    with caplog.at_level(logging.ERROR, logger=LOGGER.name):
+        for _ in range(50):
+            failures.error("192.168.0.100", "/api/info/get", "Failed %s", 1)
+        failures.error("192.168.0.101", "/api/info/get", "Failed %s", 2)
+        assert [r.getMessage() for r in caplog.records] == [
+            "Failed 1", "Failed 2"
+        ]
+        failures.flush()
+    assert len(caplog.records) == 3
+    assert caplog.records[-1].getMessage().startswith(
+        "49 more failures from 192.168.0.100 /api/info/get")
+    assert failures.counts[("192.168.0.100", "/api/info/get")] == 50
+    assert failures.hub_counts("192.168.0.101") == {"/api/info/get": 1}
+
+
+@pytest.mark.asyncio
+async def test_summary_is_scheduled(caplog):
+    """Test that a summary is logged without waiting for another failure."""
+    failures = FailureLog(LOGGER, summary_interval=0.05)
+    with caplog.at_level(logging.ERROR, logger=LOGGER.name):
+        for _ in range(5):
+            failures.error("192.168.0.100", "/api/info/get", "Failed")
+        assert len(caplog.records) == 1
+        await asyncio.sleep(0.1)
+    assert len(caplog.records) == 2
+    assert caplog.records[-1].getMessage().startswith(
+        "4 more failures from 192.168.0.100 /api/info/get")
+
+
+def test_summary_moves_to_new_loop(caplog):
+    """Test that a summary pending on a closed loop is rescheduled."""
+    failures = FailureLog(LOGGER, summary_interval=0.05)
+
+    async def fail(endpoint):
+        for _ in range(3):
+            failures.error("192.168.0.100", endpoint, "Failed")
+
+    async def fail_and_wait(endpoint):
+        await fail(endpoint)
+        await asyncio.sleep(0.1)
+
+    with caplog.at_level(logging.ERROR, logger=LOGGER.name):
+        asyncio.run(fail("/api/info/get"))
+        asyncio.run(fail_and_wait("/api/config/get"))
+    summaries = sorted(r.getMessage() for r in caplog.records
+                       if "more failures" in r.getMessage())
+    assert len(summaries) == 2
+    assert summaries[0].startswith(
+        "2 more failures from 192.168.0.100 /api/config/get")
+    assert summaries[1].startswith(
+        "2 more failures from 192.168.0.100 /api/info/get")
+
+
+def test_reset_starts_new_interval(caplog):
+    """Test that reset refills the token bucket and restarts the interval."""
+    failures = FailureLog(LOGGER, rate=0.0, burst=1, summary_interval=3600)
+    with caplog.at_level(logging.ERROR, logger=LOGGER.name):
+        failures.error("192.168.0.100", "/api/info/get", "Failed 1")
+        failures.error("192.168.0.101", "/api/info/get", "Failed 2")
+        failures.reset()
+        failures.error("192.168.0.102", "/api/info/get", "Failed 3")
+        failures.flush()
+    assert [r.getMessage() for r in caplog.records] == ["Failed 1", "Failed 3"]
+
+
+def test_token_bucket_limits_new_keys(caplog):
+    """Test that many distinct failures are limited by the token bucket."""
+    failures = FailureLog(LOGGER, rate=0.0, burst=3, summary_interval=3600)
+    with caplog.at_level(logging.ERROR, logger=LOGGER.name):
+        for number in range(10):
+            failures.error(f"192.168.0.{number}", "/api/info/get", "Failed")
+    assert len(caplog.records) == 3
+    assert sum(failures.counts.values()) == 10
+
+
+def test_disabled_logger_only_counts(caplog):
+    """Test that nothing is logged or queued when errors are disabled."""
+    failures = FailureLog(LOGGER)
+    with caplog.at_level(logging.CRITICAL, logger=LOGGER.name):
+        failures.error("192.168.0.100", "/api/info/get", "Failed")
+        failures.flush()
+    assert not caplog.records
+    assert failures.hub_counts("192.168.0.100") == {"/api/info/get": 1}
+    failures.reset()
+    assert not failures.counts
@@ -0,0 +1,136 @@
+"""Tests for fleet.py."""
+
+import asyncio
+
+import pytest
+from aioresponses import aioresponses
+
+from vegehub.fleet import VegeHubFleet
+from vegehub.vegehub import VegeHub
+from .test_helpers import UPDATE_DATA
+from .test_vegehub import ACTUATOR_INFO_PAYLOAD, HUB_INFO_PAYLOAD
+
+OTHER_UPDATE = dict(UPDATE_DATA, mac="112233445566")
+
+
+@pytest.fixture(name="fleet")
+def fixture_fleet():
+    """Fixture for a fleet of two hubs with known info."""
+    return VegeHubFleet([
+        VegeHub("192.168.0.100",
+                mac_address="7C9EBD4B49D8",
+                info=HUB_INFO_PAYLOAD["hub"]),
+        VegeHub("192.168.0.101",
+                mac_address="112233445566",
+                info=HUB_INFO_PAYLOAD["hub"]),
+    ])
+
+
+def test_fleet_lookup(fleet):
+    """Test adding, finding and removing hubs."""
+    assert len(fleet) == 2
+    hub = fleet.get("7c:9e:bd:4b:49:d8")
+    assert hub.ip_address == "192.168.0.100"
+    fleet.remove(hub)
+    assert fleet.get("7C9EBD4B49D8") is None
+    fleet.add(VegeHub("192.168.0.102"))
+    assert fleet.get("192.168.0.102").ip_address == "192.168.0.102"
+
+
+@pytest.mark.asyncio
+async def test_fleet_watch(fleet):
+    """Test that the fleet watcher yields readings from every hub."""
+    watcher = fleet.watch()
+
+    assert (await fleet.handle_push(UPDATE_DATA))["analog_0"] == 1.5
+    await fleet.handle_push(OTHER_UPDATE)
+    assert await fleet.handle_push(dict(UPDATE_DATA, mac="FFFFFFFFFFFF")) == {}
+
+    assert (await watcher.__anext__()).mac == "7C9EBD4B49D8"
+    assert (await watcher.__anext__()).mac == "112233445566"
+    await watcher.aclose()
+    assert all(not hub._watchers for hub in fleet.hubs)
+
+
+@pytest.mark.asyncio
+async def test_fleet_deadline(fleet):
+    """Test that hubs still running at the deadline are reported as timed out."""
+
+    async def operation(hub):
+        if hub.ip_address == "192.168.0.101":
+            await asyncio.sleep(10)
+        if hub.ip_address == "192.168.0.102":
+            raise ConnectionError
+        return hub.ip_address
+
+    fleet.add(VegeHub("192.168.0.102", mac_address="AABBCCDDEEFF"))
+    results = await fleet.run(operation, timeout=0.05)
+    assert results["7C9EBD4B49D8"].ok
+    assert results["7C9EBD4B49D8"].value == "192.168.0.100"
+    assert results["112233445566"].timed_out
+    assert not results["112233445566"].ok
+    assert isinstance(results["AABBCCDDEEFF"].error, ConnectionError)
+    assert not results["AABBCCDDEEFF"].timed_out
+
+
+@pytest.mark.asyncio
+async def test_fleet_hedged_read(fleet):
+    """Test that a slow hub gets one hedged request in its hedge slot."""
+    slow_hub = fleet.get("112233445566")
+    calls = []
+
+    async def operation(hub):
+        calls.append(hub.ip_address)
+        async with hub._queue.slot():
+            if hub is slow_hub and calls.count(hub.ip_address) == 1:
+                await asyncio.sleep(10)
+            return "answer"
+
+    # Nothing to base a hedge delay on yet.
+    results = await fleet.run(operation, timeout=0.05, hedge=True)
+    assert results["112233445566"].timed_out
+    assert fleet.hedges_sent == 0
+
+    for _ in range(5):
+        await fleet.run(operation)
+    calls.clear()
+    results = await fleet.run(operation, timeout=5, hedge=True)
+    assert all(result.value == "answer" for result in results.values())
+    assert calls.count("192.168.0.101") == 2
+    assert calls.count("192.168.0.100") == 1
+    assert fleet.hedges_sent == 1
+    assert slow_hub.queue_metrics["hedged_requests"] == 1
+    assert slow_hub.queue_metrics["in_flight"] == 0
+    assert fleet.operation_latency(slow_hub) is not None
+
+
+@pytest.mark.asyncio
+async def test_fleet_limit_not_timed(fleet):
+    """Test that waiting on the limit is not counted as operation time."""
+
+    async def operation(hub):
+        await asyncio.sleep(0.05)
+        return hub.ip_address
+
+    results = await fleet.run(operation, limit=1)
+    assert all(result.ok for result in results.values())
+    for hub in fleet.hubs:
+        assert 0.05 <= fleet.operation_latency(hub) < 0.09
+
+
+@pytest.mark.asyncio
+async def test_fleet_actuator_states(fleet):
+    """Test fetching actuator states and info across the fleet."""
+    with aioresponses() as mocked:
+        mocked.get("http://192.168.0.100/api/actuators/status",
+                   payload=ACTUATOR_INFO_PAYLOAD)
+        mocked.get("http://192.168.0.101/api/actuators/status", status=500)
+        mocked.post("http://192.168.0.100/api/info/get",
+                    payload=HUB_INFO_PAYLOAD)
+        mocked.post("http://192.168.0.101/api/info/get",
+                    payload=HUB_INFO_PAYLOAD)
+        states = await fleet.actuator_states(timeout=1)
+        info = await fleet.info(timeout=1)
+    assert states["7C9EBD4B49D8"].value[0]["slot"] == 0
+    assert isinstance(states["112233445566"].error, ConnectionError)
+    assert info["112233445566"].value == HUB_INFO_PAYLOAD["hub"]
@@ -0,0 +1,97 @@
+"""Tests for health.py."""
+
+import pytest
+
+from vegehub.health import Ewma, HealthTracker
+from vegehub.transport import InProcessTransport, SimulatedHub
+from vegehub.vegehub import VegeHub
+from .test_helpers import UPDATE_DATA, UPDATE_DATA_2
+
+
+def test_ewma():
+    """Test the exponentially weighted mean and deviation."""
+    stats = Ewma(alpha=0.5)
+    assert stats.mean is None
+    stats.add(10)
+    assert (stats.mean, stats.stddev) == (10, 0)
+    stats.add(20)
+    assert stats.mean == 15
+    assert stats.variance == pytest.approx(25)
+    assert stats.count == 2
+
+
+def test_observe_update():
+    """Test signal, push lag and battery taken from update payloads."""
+    tracker = HealthTracker()
+    tracker.observe_update(UPDATE_DATA, 4, False,
+                           received=UPDATE_DATA["send_time"] + 3)
+    health = tracker.get("7C:9E:BD:4B:49:D8")
+    assert health.wifi.mean == -27
+    assert health.push_lag.mean == 3
+    assert health.battery.mean == pytest.approx(9.3148, abs=1e-4)
+    assert health.battery_trend.mean is None
+
+    # Months later: the battery went up, so the trend is positive.
+    tracker.observe_update(UPDATE_DATA_2, 4, False,
+                           received=UPDATE_DATA_2["send_time"] + 5)
+    assert health.battery_trend.mean > 0
+    assert health.payloads == 2
+    assert health.badness("battery_trend") == 0
+    assert health.badness("wifi") == 0
+    assert health.as_dict()["mac"] == "7C9EBD4B49D8"
+
+    # Without the hub layout, the battery slot is unknown.
+    tracker.observe_update(dict(UPDATE_DATA, mac="AA"))
+    assert tracker.get("AA").battery.mean is None
+    assert len(tracker) == 2
+
+
+def test_battery_trend_from_info():
+    """Test that a draining battery lowers the hub's ranking."""
+    tracker = HealthTracker(alpha=1.0)
+    tracker.observe_info("7C9EBD000001", {"batt_v": 9.0}, received=0)
+    tracker.observe_info("7C9EBD000001", {"batt_v": 8.99}, received=60)
+    assert tracker.get("7C9EBD000001").battery_trend.mean is None
+    tracker.observe_info("7C9EBD000001", {"batt_v": 8.8}, received=43200)
+    health = tracker.get("7C9EBD000001")
+    assert health.battery_trend.mean == pytest.approx(-0.4)
+    assert health.badness("battery_trend") == pytest.approx(4)
+
+
+def test_worst_ranking():
+    """Test ranking hubs overall and by a single metric."""
+    tracker = HealthTracker(alpha=1.0)
+    for number, (rtt, wifi) in enumerate([(0.1, -50), (2.0, -55), (0.2, -90)]):
+        mac = f"7C9EBD00000{number}"
+        tracker.observe_rtt(mac, rtt)
+        tracker.observe_update({"mac": mac, "wifi_str": wifi})
+    tracker.get("7C9EBD000009")  # No data at all
+
+    assert [h.mac for h in tracker.worst()] == [
+        "7C9EBD000002", "7C9EBD000001", "7C9EBD000000"
+    ]
+    assert [h.mac for h in tracker.worst(1, "rtt")] == ["7C9EBD000001"]
+    assert tracker.get("7C9EBD000002").badness() == pytest.approx(3.2)
+    with pytest.raises(KeyError):
+        tracker.worst(metric="uptime")
+    tracker.forget("7C:9E:BD:00:00:02")
+    assert tracker.worst(1)[0].mac == "7C9EBD000001"
+
+
+@pytest.mark.asyncio
+async def test_observe_hub():
+    """Test taking request round trip times from a hub."""
+    transport = InProcessTransport()
+    transport.add_host("10.0.0.1", SimulatedHub("7C:9E:BD:00:00:01"))
+    hub = VegeHub("10.0.0.1", transport=transport)
+    tracker = HealthTracker()
+    tracker.observe_hub(hub)
+    assert not len(tracker)
+
+    info = await hub.get_info()
+    tracker.observe_info(hub.mac_address, info)
+    tracker.observe_hub(hub)
+    tracker.observe_hub(hub)
+    health = tracker.get("7C9EBD000001")
+    assert health.rtt.count == 1
+    assert health.battery.mean == 9.0
@@ -1,7 +1,10 @@
 """Tests for helpers.py."""
 
+import math
+
 import pytest
 from vegehub.helpers import vh400_transform, therm200_transform, update_data_to_latest_dict, update_data_to_ha_dict
+from vegehub.helpers import update_data_to_latest_columns, iter_update_columns
 
 UPDATE_DATA = {"api_key":"","mac":"7C9EBD4B49D8","error_code":0,"sensors":[{"slot":1,"samples":[{"v":1.5,"t":"2025-01-15T16:51:23Z"}]},{"slot":2,"samples":[{"v":1.45599997,"t":"2025-01-15T16:51:23Z"}]},{"slot":3,"samples":[{"v":1.330000043,"t":"2025-01-15T16:51:23Z"}]},{"slot":4,"samples":[{"v":0.075999998,"t":"2025-01-15T16:51:23Z"}]},{"slot":5,"samples":[{"v":9.314800262,"t":"2025-01-15T16:51:23Z"}]},{"slot":6,"samples":[{"v":1,"t":"2025-01-15T16:51:23Z"}]},{"slot":7,"samples":[{"v":0,"t":"2025-01-15T16:51:23Z"}]}],"send_time":1736959883,"wifi_str":-27}
 UPDATE_DATA_2 = {'api_key': '', 'mac': '7C9EBD4B49D8', 'error_code': 0, 'sensors': [{'slot': 1, 'samples': [{'v': 1.518, 't': '2025-05-16T20:38:40Z'}]}, {'slot': 2, 'samples': [{'v': 1.498, 't': '2025-05-16T20:38:40Z'}]}, {'slot': 3, 'samples': [{'v': 0.026, 't': '2025-05-16T20:38:40Z'}]}, {'slot': 4, 'samples': [{'v': 2.346, 't': '2025-05-16T20:38:40Z'}]}, {'slot': 5, 'samples': [{'v': 9.3588, 't': '2025-05-16T20:38:40Z'}]}], 'send_time': 1747427920, 'wifi_str': -28}
@@ -139,4 +142,64 @@ def test_update_ha_data_converter_all_actuators():
     assert data["actuator_1"] == 0
     assert data["actuator_3"] == 0
     assert "actuator_4" not in data
-    
\ No newline at end of file
+
+
+def test_update_data_to_latest_columns():
+    """Test columnar decoding of several payloads."""
+    columns = update_data_to_latest_columns(
+        [UPDATE_DATA, {}, UPDATE_DATA_2,
+         {"mac": "7C9EBD4B49D8", "sensors": [{"slot": 1, "samples": []}]}],
+        as_numpy=False)
+    assert len(columns["mac"]) == 12
+    assert columns["mac"][0] == "7c9ebd4b49d8"
+    assert list(columns["slot"][:7]) == [1, 2, 3, 4, 5, 6, 7]
+    assert columns["timestamp"][0] == 1736959883
+    assert columns["timestamp"][7] == 1747427920
+    assert columns["value"][11] == 9.3588
+    latest = update_data_to_latest_dict(UPDATE_DATA)
+    for mac, slot, value in zip(columns["mac"][:7], columns["slot"],
+                                columns["value"]):
+        assert latest[f"{mac}_{slot}"] == value
+
+
+def test_update_data_to_latest_columns_timestamp_fallback():
+    """Test that a missing or bad sample time falls back to send_time."""
+    columns = update_data_to_latest_columns([{
+        "mac": "7C9EBD4B49D8",
+        "send_time": 100,
+        "sensors": [{"slot": 1, "samples": [{"v": 1}]},
+                    {"slot": 2, "samples": [{"v": 2, "t": "bad"}]}]
+    }, {
+        "mac": "7C9EBD4B49D8",
+        "send_time": 200,
+        "sensors": [{"slot": 2, "samples": [{"v": 3, "t": "bad"}]}]
+    }], as_numpy=False)
+    assert list(columns["timestamp"]) == [100, 100, 200]
+
+
+def test_update_data_to_latest_columns_bad_value():
+    """Test that a value that is not a number is stored as NaN."""
+    columns = update_data_to_latest_columns([{
+        "mac": "7C9EBD4B49D8",
+        "sensors": [{"slot": 1, "samples": [{"v": None}]},
+                    {"slot": 2, "samples": [{"v": "wet"}]},
+                    {"slot": 3, "samples": [{"v": "1.5"}]}]
+    }], as_numpy=False)
+    assert list(columns["slot"]) == [1, 2, 3]
+    assert math.isnan(columns["value"][0])
+    assert math.isnan(columns["value"][1])
+    assert columns["value"][2] == 1.5
+
+
+def test_update_data_to_latest_columns_numpy():
+    """Test NumPy output when NumPy is installed."""
+    numpy = pytest.importorskip("numpy")
+    columns = update_data_to_latest_columns([UPDATE_DATA], as_numpy=True)
+    assert columns["value"].dtype == numpy.float64
+    assert columns["slot"].sum() == 28
+
+
+def test_iter_update_columns():
+    """Test decoding a stream of payloads in bounded chunks."""
+    chunks = list(iter_update_columns(iter([UPDATE_DATA] * 5), chunk_size=2))
+    assert [len(chunk["mac"]) for chunk in chunks] == [14, 14, 7]
@@ -0,0 +1,67 @@
+"""Tests for the import footprint of the package."""
+
+import subprocess
+import sys
+
+import pytest
+
+import vegehub
+
+# Generous budget in microseconds; the real cost is a few tens of
+# milliseconds, but this has to hold on slow CI machines too.
+HELPERS_IMPORT_BUDGET_US = 250000
+
+
+def import_times(statement):
+    """Run a statement in a fresh interpreter and parse -X importtime output."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("statement", [
+    "import vegehub.helpers",
+    "import vegehub.helpers, vegehub.delta, vegehub.sensors, vegehub.models",
+    "import vegehub.helpers, vegehub.store, vegehub.aggregates",
+])
+def test_helpers_import_time(statement):
+    """Test that decode-only imports stay light."""
+    times = import_times(statement)
+    assert not [name for name in times if name.startswith("aiohttp")]
+    assert times["vegehub.helpers"] < HELPERS_IMPORT_BUDGET_US
+
+
+def test_package_import_is_lazy():
+    """Test that names taken from the package do not load aiohttp."""
+    result = subprocess.run([
+        sys.executable, "-c",
+        "import sys\n"
+        "from vegehub import vh400_transform, update_data_to_ha_dict\n"
+        "from vegehub import DeltaDecoder, SensorPipeline, HubInfo\n"
+        "print('aiohttp' in sys.modules)\n"
+        "from vegehub import VegeHub\n"
+        "print('aiohttp' in sys.modules)\n"
+    ],
+                            capture_output=True,
+                            text=True,
+                            check=True)
+    assert result.stdout.split() == ["False", "True"]
+
+
+def test_lazy_attributes():
+    """Test that package attributes still resolve, and unknown ones fail."""
+    assert vegehub.VegeHub.__name__ == "VegeHub"
+    assert vegehub.update_data_to_ha_dict({}, 4, 2, False) == {}
+    assert "VegeHub" in dir(vegehub)
+    with pytest.raises(AttributeError):
+        vegehub.NotAThing  # pylint: disable=pointless-statement
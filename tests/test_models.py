@@ -0,0 +1,78 @@
+"""Tests for models.py."""
+
+import pytest
+
+from vegehub.models import ActuatorStatus, HubConfig, HubInfo, UpdatePayload
+from .test_helpers import UPDATE_DATA, UPDATE_DATA_2
+from .test_vegehub import (ACTUATOR_INFO_PAYLOAD, HUB_INFO_PAYLOAD,
+                           NUM_ACTUATORS, NUM_CHANNELS, SW_VER, TEST_API_KEY,
+                           TEST_SERVER)
+
+
+def test_hub_info():
+    """Test parsing the hub section of an info response."""
+    info = HubInfo.from_dict(HUB_INFO_PAYLOAD["hub"])
+    assert info.num_sensors == NUM_CHANNELS
+    assert info.num_actuators == NUM_ACTUATORS
+    assert info.sw_version == SW_VER
+    assert info.is_ac is False
+    assert info.batt_v == 9.0
+    assert not hasattr(info, "__dict__")
+
+    with pytest.raises(ValueError):
+        HubInfo.from_dict({"num_channels": "four"})
+
+
+def test_hub_config_round_trip():
+    """Test parsing a config and building one to send back."""
+    config = HubConfig.from_dict({
+        "api_key": "",
+        "hub": {
+            "server_url": "",
+            "server_type": "1",
+            "name": "garden"
+        }
+    })
+    assert config.server_type == 1
+    config.api_key = TEST_API_KEY
+    config.server_url = TEST_SERVER
+    config.server_type = 3
+    assert config.to_dict() == {
+        "api_key": TEST_API_KEY,
+        "hub": {
+            "server_url": TEST_SERVER,
+            "server_type": 3,
+            "name": "garden"
+        }
+    }
+    with pytest.raises(ValueError):
+        HubConfig.from_dict({"api_key": ""})
+
+
+def test_actuator_status():
+    """Test parsing actuator status entries."""
+    status = ActuatorStatus.from_dict(ACTUATOR_INFO_PAYLOAD["actuators"][0])
+    assert status.slot == 0
+    assert status.state == 0
+    assert status.next_window_end == 1730916600
+    with pytest.raises(ValueError):
+        ActuatorStatus.from_dict({"state": 1})
+    with pytest.raises(ValueError):
+        ActuatorStatus.from_dict({"slot": 0, "cur_ma": "high"})
+
+
+def test_update_payload():
+    """Test parsing update payloads."""
+    payload = UpdatePayload.from_dict(UPDATE_DATA)
+    assert payload.mac == "7C9EBD4B49D8"
+    assert payload.send_time == 1736959883
+    assert payload.wifi_str == -27
+    assert payload.sensors[0].slot == 1
+    assert payload.sensors[0].times == ("2025-01-15T16:51:23Z",)
+    assert payload.sensors[4].latest == 9.314800262
+    assert UpdatePayload.from_dict(UPDATE_DATA_2).latest_values()[3] == 0.026
+    with pytest.raises(ValueError):
+        UpdatePayload.from_dict({})
+    for bad in ({"send_time": [1]}, {"wifi_str": "strong"}):
+        with pytest.raises(ValueError):
+            UpdatePayload.from_dict(dict(UPDATE_DATA, **bad))
@@ -0,0 +1,106 @@
+"""Tests for profiling.py."""
+
+import inspect
+import json
+import pstats
+import tracemalloc
+
+from aioresponses import aioresponses
+import pytest
+
+from vegehub import profiling
+from vegehub.helpers import update_data_to_ha_dict
+from vegehub.vegehub import VegeHub
+from .test_helpers import UPDATE_DATA
+from .test_vegehub import HUB_INFO_PAYLOAD, IP_ADDR
+
+
+@pytest.fixture(autouse=True)
+def fixture_reset_profiling():
+    """Leave profiling disabled and empty after every test."""
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def test_disabled_records_nothing():
+    """Test that nothing is timed until profiling is enabled."""
+    assert not profiling.is_enabled()
+    update_data_to_ha_dict(UPDATE_DATA, 4, 2, False)
+    with profiling.stage("custom"):
+        pass
+    assert profiling.stage_stats() == {}
+
+    profiling.enable()
+    update_data_to_ha_dict(UPDATE_DATA, 4, 2, False)
+    update_data_to_ha_dict(UPDATE_DATA, 4, 2, False)
+    with profiling.stage("custom"):
+        pass
+    profiling.disable()
+    update_data_to_ha_dict(UPDATE_DATA, 4, 2, False)
+    stats = profiling.stage_stats()
+    assert stats["decode.ha_dict"]["count"] == 2
+    assert stats["custom"]["count"] == 1
+    assert stats["decode.ha_dict"]["max"] >= stats["decode.ha_dict"]["mean"]
+
+
+@pytest.mark.asyncio
+async def test_timed_coroutine():
+    """Test that coroutine functions are timed when awaited."""
+    # timed() checks the flag itself to avoid importing inspect.
+    assert profiling._CO_COROUTINE == inspect.CO_COROUTINE  # pylint: disable=protected-access
+
+    @profiling.timed("custom.async")
+    async def handler(value):
+        return value * 2
+
+    assert inspect.iscoroutinefunction(handler)
+    profiling.enable()
+    assert await handler(2) == 4
+    assert profiling.stage_stats()["custom.async"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_stages(tmp_path):
+    """Test timing requests, JSON decoding and pipeline decoding."""
+    profiling.enable()
+    hub = VegeHub(IP_ADDR, sensor_types={0: "vh400"})
+    with aioresponses() as mocked:
+        mocked.post(f"http://{IP_ADDR}/api/info/get", payload=HUB_INFO_PAYLOAD)
+        await hub.get_info()
+    hub.decode_update(UPDATE_DATA)
+
+    stats = profiling.stage_stats()
+    assert stats["http.session"]["count"] == 2
+    assert stats["http.request"]["count"] == 1
+    assert stats["json"]["count"] == 1
+    assert stats["decode.pipeline"]["count"] == 1
+
+    path = tmp_path / "stages.json"
+    profiling.dump_stats(str(path))
+    assert json.loads(path.read_text())["json"]["count"] == 1
+
+
+def test_profile_window(tmp_path):
+    """Test dumping a cProfile window to a file."""
+    path = tmp_path / "decode.prof"
+    with profiling.profile_window(str(path)):
+        for _ in range(10):
+            update_data_to_ha_dict(UPDATE_DATA, 4, 2, False)
+    stats = pstats.Stats(str(path))
+    assert any(name == "update_data_to_ha_dict"
+               for _, _, name in stats.stats)
+
+
+def test_trace_memory(tmp_path):
+    """Test taking and dumping a tracemalloc snapshot."""
+    path = tmp_path / "memory.snapshot"
+    with profiling.trace_memory(str(path)) as snapshots:
+        decoded = [
+            update_data_to_ha_dict(UPDATE_DATA, 4, 2, False)
+            for _ in range(100)
+        ]
+    assert len(decoded) == 100
+    assert not tracemalloc.is_tracing()
+    assert snapshots[0].statistics("filename")
+    assert tracemalloc.Snapshot.load(str(path)).statistics("filename")
@@ -0,0 +1,105 @@
+"""Tests for replay.py."""
+
+import json
+import time
+import tracemalloc
+
+import aiohttp
+import pytest
+from aioresponses import aioresponses
+
+from vegehub.helpers import vh400_transform
+from vegehub.replay import (CaptureWriter, async_replay, decode_handler,
+                            http_push_handler, main, read_capture,
+                            record_capture, replay)
+from .test_helpers import UPDATE_DATA, UPDATE_DATA_2
+
+PAYLOADS = [UPDATE_DATA, UPDATE_DATA_2] * 5
+
+
+def test_capture_round_trip(tmp_path):
+    """Test that captures keep payloads and offsets in order."""
+    path = str(tmp_path / "capture.jsonl.gz")
+    assert record_capture(path, PAYLOADS, interval=0.5) == 10
+    records = list(read_capture(path))
+    assert [offset for offset, _ in records][:3] == [0.0, 0.5, 1.0]
+    assert [payload for _, payload in records] == PAYLOADS
+
+    with CaptureWriter(path) as writer:
+        writer.write(UPDATE_DATA, 10.0)
+        writer.write(UPDATE_DATA_2, 12.5)
+    assert [offset for offset, _ in read_capture(path)] == [0.0, 2.5]
+
+
+def test_replay_decode(tmp_path):
+    """Test replaying through the decoder at maximum speed."""
+    path = str(tmp_path / "capture.jsonl.gz")
+    record_capture(path, PAYLOADS, interval=60)
+    decoded = []
+    handler = decode_handler(4, 2, False, {"analog_0": vh400_transform})
+
+    report = replay(path, lambda data: decoded.append(handler(data)))
+    assert report.count == 10
+    assert report.throughput > 0
+    assert report.percentile(50) <= report.percentile(99)
+    assert report.peak == 0
+    assert decoded[0]["analog_0"] == vh400_transform(1.5)
+    assert set(report.as_dict()) == {
+        "count", "elapsed", "throughput", "p50", "p95", "p99",
+        "retained_bytes", "peak_bytes"
+    }
+
+
+def test_replay_trace_memory(tmp_path):
+    """Test tracing memory, and leaving tracing on if it already was."""
+    path = str(tmp_path / "capture.jsonl.gz")
+    record_capture(path, PAYLOADS)
+    decoded = []
+    handler = decode_handler(4, 2, False)
+
+    report = replay(path, lambda data: decoded.append(handler(data)),
+                    trace_memory=True)
+    assert report.peak >= report.retained > 0
+    assert not tracemalloc.is_tracing()
+
+    tracemalloc.start()
+    try:
+        report = replay(path, handler, trace_memory=True)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert report.peak > 0
+
+
+def test_replay_paced(tmp_path):
+    """Test that a paced replay follows the recorded timing."""
+    path = str(tmp_path / "capture.jsonl.gz")
+    record_capture(path, PAYLOADS[:3], interval=1.0)
+    start = time.perf_counter()
+    report = replay(path, lambda data: None, speed=50)
+    assert time.perf_counter() - start >= 0.04
+    assert report.retained == 0
+
+
+@pytest.mark.asyncio
+async def test_async_replay_http(tmp_path):
+    """Test replaying against a push endpoint."""
+    path = str(tmp_path / "capture.jsonl.gz")
+    record_capture(path, PAYLOADS[:2])
+    url = "http://127.0.0.1:8123/api/vegehub/update"
+    with aioresponses() as mocked:
+        mocked.post(url, repeat=True)
+        async with aiohttp.ClientSession() as session:
+            report = await async_replay(path, http_push_handler(session, url))
+    assert report.count == 2
+
+
+def test_main(tmp_path, capsys):
+    """Test the record and replay commands."""
+    source = tmp_path / "payloads.jsonl"
+    source.write_text("\n".join(json.dumps(p) for p in PAYLOADS))
+    capture = str(tmp_path / "capture.jsonl.gz")
+    assert main(["record", str(source), capture]) == 0
+    assert json.loads(capsys.readouterr().out) == {"recorded": 10}
+    assert main(["replay", capture]) == 0
+    assert json.loads(capsys.readouterr().out)["count"] == 10
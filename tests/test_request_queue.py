@@ -0,0 +1,119 @@
+"""Tests for request_queue.py."""
+
+import asyncio
+
+import pytest
+
+from vegehub.request_queue import (PRIORITY_COMMAND, PRIORITY_CONFIG,
+                                   PRIORITY_POLL, RequestQueue, hedged_context)
+
+
+async def run_request(queue, priority, name, order, hold=0.01):
+    """Take a turn on the queue and record when it was granted."""
+    async with queue.slot(priority):
+        order.append(name)
+        await asyncio.sleep(hold)
+
+
+@pytest.mark.asyncio
+async def test_priority_order():
+    """Test that commands jump ahead of waiting polls."""
+    queue = RequestQueue()
+    order = []
+    tasks = [
+        asyncio.create_task(run_request(queue, PRIORITY_POLL, "poll_1",
+                                        order)),
+        asyncio.create_task(run_request(queue, PRIORITY_POLL, "poll_2",
+                                        order)),
+        asyncio.create_task(run_request(queue, PRIORITY_CONFIG, "config",
+                                        order)),
+        asyncio.create_task(run_request(queue, PRIORITY_COMMAND, "command",
+                                        order)),
+    ]
+    await asyncio.gather(*tasks)
+    assert order == ["poll_1", "command", "config", "poll_2"]
+    metrics = queue.metrics
+    assert metrics["total_requests"] == 4
+    assert metrics["max_depth"] == 3
+    assert metrics["depth"] == 0
+    assert metrics["max_wait"] > 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    """Test that no more than the configured number run at once."""
+    queue = RequestQueue(concurrency=2)
+    running = 0
+    peak = 0
+
+    async def request():
+        nonlocal running, peak
+        async with queue.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*[request() for _ in range(6)])
+    assert peak == 2
+    assert queue.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_releases_turn():
+    """Test that cancelling a waiting request does not leak its turn."""
+    queue = RequestQueue()
+    order = []
+    first = asyncio.create_task(run_request(queue, PRIORITY_POLL, "first",
+                                            order))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(
+        run_request(queue, PRIORITY_COMMAND, "cancelled", order))
+    last = asyncio.create_task(run_request(queue, PRIORITY_POLL, "last",
+                                           order))
+    await asyncio.sleep(0)
+    assert queue.depth == 2
+    waiting.cancel()
+    await asyncio.gather(first, last)
+    assert order == ["first", "last"]
+    assert queue.in_flight == 0
+
+
+def hedge(queue, priority, name, order, hold=0.01):
+    """Start a hedged request on the queue."""
+    return asyncio.get_running_loop().create_task(
+        run_request(queue, priority, name, order, hold),
+        context=hedged_context())
+
+
+@pytest.mark.asyncio
+async def test_hedges_use_capped_slot_in_order():
+    """Test that hedges wait behind queued requests and are capped."""
+    queue = RequestQueue()
+    order = []
+    stalled = asyncio.create_task(
+        run_request(queue, PRIORITY_POLL, "stalled", order, hold=0.05))
+    await asyncio.sleep(0)
+
+    # With the normal slot taken, one hedge runs in the hedge slot.
+    first_hedge = hedge(queue, PRIORITY_POLL, "hedge_1", order)
+    second_hedge = hedge(queue, PRIORITY_POLL, "hedge_2", order)
+    await asyncio.sleep(0)
+    assert order == ["stalled", "hedge_1"]
+    assert queue.in_flight == 2
+
+    # A queued command is not overtaken by hedges behind it.
+    command = asyncio.create_task(
+        run_request(queue, PRIORITY_COMMAND, "command", order))
+    third_hedge = hedge(queue, PRIORITY_POLL, "hedge_3", order)
+    await asyncio.gather(stalled, first_hedge, second_hedge, command,
+                         third_hedge)
+    assert order.index("command") < order.index("hedge_3")
+    assert queue.metrics["hedged_requests"] == 3
+    assert queue.in_flight == 0
+
+
+def test_invalid_concurrency():
+    """Test that a concurrency below one is rejected."""
+    with pytest.raises(ValueError):
+        RequestQueue(0)
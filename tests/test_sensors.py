@@ -0,0 +1,51 @@
+"""Tests for sensors.py."""
+
+import pytest
+
+from vegehub import sensors
+from vegehub.helpers import (therm200_transform, update_data_to_ha_dict,
+                             vh400_transform)
+from vegehub.sensors import (SensorPipeline, register_sensor_type,
+                             sensor_types)
+from .test_helpers import (UPDATE_DATA, UPDATE_DATA_2,
+                           UPDATE_DATA_ALL_ACTUATORS)
+
+
+@pytest.mark.parametrize("data, layout", [
+    (UPDATE_DATA, (4, 2, False)),
+    (UPDATE_DATA_2, (4, 1, False)),
+    (UPDATE_DATA_ALL_ACTUATORS, (0, 4, True)),
+    ({}, (4, 2, False)),
+    ({"mac": "7C9EBD4B49D8", "sensors": [{"slot": 1, "samples": []}]},
+     (4, 2, False)),
+])
+def test_raw_pipeline_matches_ha_dict(data, layout):
+    """Test that an untyped pipeline decodes like update_data_to_ha_dict."""
+    assert SensorPipeline(*layout).decode(data) == update_data_to_ha_dict(
+        data, *layout)
+
+
+def test_typed_pipeline():
+    """Test that slot transforms are applied in the same pass."""
+    pipeline = SensorPipeline(4, 2, False, {0: "vh400", 2: "therm200"})
+    data = pipeline.decode(UPDATE_DATA)
+    assert data["analog_0"] == vh400_transform(1.5)
+    assert data["analog_1"] == 1.45599997
+    assert data["analog_2"] == therm200_transform(1.330000043)
+    assert data["battery"] == 9.314800262
+    assert data["actuator_1"] == 0
+
+
+def test_register_sensor_type(monkeypatch):
+    """Test plugging in a new probe type."""
+    monkeypatch.setattr(sensors, "_SENSOR_TYPES", dict(sensors._SENSOR_TYPES))
+    register_sensor_type("double", lambda value: value * 2)
+    assert "double" in sensor_types()
+    assert SensorPipeline(4, 2, False, {1: "double"}).decode(
+        UPDATE_DATA)["analog_1"] == pytest.approx(2.91199994)
+
+
+def test_unknown_sensor_type():
+    """Test that unknown probe types are rejected when compiling."""
+    with pytest.raises(KeyError):
+        SensorPipeline(4, 2, False, {0: "nonexistent"})
@@ -0,0 +1,82 @@
+"""Tests for sink.py."""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from vegehub.helpers import update_data_to_ha_dict
+from vegehub.sink import SQLiteSink
+from .test_helpers import UPDATE_DATA
+
+
+def read_rows(path):
+    """Return every stored row, in insertion order."""
+    with sqlite3.connect(path) as connection:
+        return connection.execute(
+            "SELECT mac, entity, timestamp, value FROM readings "
+            "ORDER BY rowid").fetchall()
+
+
+@pytest.mark.asyncio
+async def test_flush_by_size(tmp_path):
+    """Test that full batches are written without waiting for max_age."""
+    path = str(tmp_path / "readings.db")
+    async with SQLiteSink(path, batch_size=10, max_age=60) as sink:
+        for number in range(25):
+            await sink.put("7C9EBD4B49D8", "analog_0", number, number / 2)
+        for _ in range(100):
+            if sink.rows_written == 20:
+                break
+            await asyncio.sleep(0.01)
+        assert sink.batches_written == 2
+        assert sink.metrics["rows_written"] == 20
+
+    rows = read_rows(path)
+    assert len(rows) == 25
+    assert rows[0] == ("7c9ebd4b49d8", "analog_0", 0, 0.0)
+    assert rows[-1] == ("7c9ebd4b49d8", "analog_0", 24, 12.0)
+    with sqlite3.connect(path) as connection:
+        assert connection.execute(
+            "PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+@pytest.mark.asyncio
+async def test_flush_by_age(tmp_path):
+    """Test that a partial batch is written once max_age has passed."""
+    path = str(tmp_path / "readings.db")
+    async with SQLiteSink(path, batch_size=1000, max_age=0.05) as sink:
+        values = update_data_to_ha_dict(UPDATE_DATA, 4, 2, False)
+        await sink.put_ha_dict("7C9EBD4B49D8", values, 1747427908)
+        await asyncio.sleep(0.2)
+        assert sink.batches_written == 1
+        assert sink.rows_written == len(values)
+        assert sink.metrics["queued"] == 0
+        assert sink.metrics["rows_per_second"] > 0
+
+
+@pytest.mark.asyncio
+async def test_backpressure(tmp_path):
+    """Test that put waits while the queue is full."""
+    sink = SQLiteSink(str(tmp_path / "readings.db"), queue_size=2)
+    with pytest.raises(RuntimeError):
+        await sink.put("7C9EBD4B49D8", "analog_0", 0, 1.0)
+
+    await sink.start()
+    # Stop the writer so nothing drains the queue.
+    sink._pump.cancel()  # pylint: disable=protected-access
+    await asyncio.sleep(0)
+    await sink.put("7C9EBD4B49D8", "analog_0", 0, 1.0)
+    await sink.put("7C9EBD4B49D8", "analog_0", 1, 1.0)
+    blocked = asyncio.create_task(sink.put("7C9EBD4B49D8", "analog_0", 2, 1.0))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    blocked.cancel()
+    await sink.close()
+    assert sink.rows_written == 2
+
+
+def test_bad_table_name(tmp_path):
+    """Test that table names are checked before use in SQL."""
+    with pytest.raises(ValueError):
+        SQLiteSink(str(tmp_path / "readings.db"), table="readings; DROP")
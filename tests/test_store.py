@@ -0,0 +1,97 @@
+"""Tests for store.py."""
+
+import pytest
+
+from vegehub import store
+from vegehub.store import SampleStore
+from .test_helpers import UPDATE_DATA
+
+MAC = "7C9EBD4B49D8"
+
+
+@pytest.fixture(name="small_strides")
+def fixture_small_strides(monkeypatch):
+    """Use a tiny index stride so queries cross several blocks."""
+    monkeypatch.setattr(store, "INDEX_STRIDE", 4)
+
+
+def test_append_and_query(tmp_path):
+    """Test that samples round-trip through the column files."""
+    with SampleStore(str(tmp_path), batch_size=3) as sample_store:
+        for i in range(10):
+            sample_store.append(MAC, "analog_2", 1000 + i * 10, i * 0.5)
+
+        timestamps, values = sample_store.query(MAC, "analog_2", 1020, 1050)
+        assert list(timestamps) == [1020, 1030, 1040, 1050]
+        assert list(values) == [1.0, 1.5, 2.0, 2.5]
+        assert sample_store.count(MAC, "analog_2") == 10
+
+    assert (tmp_path / MAC.lower() / "analog_2.ts").stat().st_size == 80
+
+
+def test_query_open_ended(tmp_path):
+    """Test queries without a start or end bound."""
+    sample_store = SampleStore(str(tmp_path))
+    for i in range(5):
+        sample_store.append(MAC, "battery", i, 9.0 + i)
+    assert list(sample_store.query(MAC, "battery")[1]) == [9, 10, 11, 12, 13]
+    assert list(sample_store.query(MAC, "battery", start=3)[0]) == [3, 4]
+    assert list(sample_store.query(MAC, "battery", end=1)[0]) == [0, 1]
+    assert list(sample_store.query(MAC, "battery", 4, 2)[0]) == []
+
+
+def test_query_uses_index_across_blocks(tmp_path, small_strides):
+    """Test range queries over many index blocks, including duplicate times."""
+    timestamps = [1, 2, 2, 2, 2, 3, 5, 5, 5, 8, 9, 9, 9, 9, 9, 12]
+    sample_store = SampleStore(str(tmp_path), batch_size=5)
+    for i, timestamp in enumerate(timestamps):
+        sample_store.append(MAC, "analog_0", timestamp, i)
+    sample_store.flush()
+
+    assert len(sample_store._load_index((MAC.lower(), "analog_0"))) == 4
+    for start in range(0, 14):
+        for end in range(start, 14):
+            expected = [t for t in timestamps if start <= t <= end]
+            assert list(sample_store.query(MAC, "analog_0", start,
+                                           end)[0]) == expected
+
+
+def test_reopen_existing_store(tmp_path):
+    """Test that a new store picks up data and ordering from disk."""
+    with SampleStore(str(tmp_path)) as sample_store:
+        sample_store.append(MAC, "analog_0", 100, 1.0)
+
+    reopened = SampleStore(str(tmp_path))
+    assert reopened.series() == [(MAC.lower(), "analog_0")]
+    with pytest.raises(ValueError):
+        reopened.append(MAC, "analog_0", 99, 2.0)
+    reopened.append(MAC, "analog_0", 101, 2.0)
+    assert list(reopened.query(MAC, "analog_0")[1]) == [1.0, 2.0]
+
+
+def test_views_survive_appends(tmp_path):
+    """Test that earlier query results remain readable after more writes."""
+    sample_store = SampleStore(str(tmp_path))
+    sample_store.append(MAC, "analog_0", 1, 1.0)
+    first = sample_store.query(MAC, "analog_0")[1]
+    sample_store.append(MAC, "analog_0", 2, 2.0)
+    second = sample_store.query(MAC, "analog_0")[1]
+    assert list(first) == [1.0]
+    assert list(second) == [1.0, 2.0]
+
+
+def test_append_update(tmp_path):
+    """Test decoding a raw update straight into the store."""
+    sample_store = SampleStore(str(tmp_path))
+    sample_store.append_update(UPDATE_DATA, 4, 2, False)
+    timestamps, values = sample_store.query(MAC, "battery")
+    assert list(timestamps) == [UPDATE_DATA["send_time"]]
+    assert values[0] == pytest.approx(9.314800262)
+    assert sample_store.count(MAC, "actuator_1") == 1
+
+
+def test_query_missing_series(tmp_path):
+    """Test querying a series that has never been written."""
+    timestamps, values = SampleStore(str(tmp_path)).query(MAC, "analog_9")
+    assert len(timestamps) == 0
+    assert len(values) == 0
@@ -0,0 +1,101 @@
+"""Tests for transport.py."""
+
+import aiohttp
+from aioresponses import aioresponses
+import pytest
+
+from vegehub.fleet import VegeHubFleet
+from vegehub.transport import (AiohttpTransport, InProcessTransport,
+                               SimulatedHub, Transport)
+from vegehub.vegehub import VegeHub
+
+
+def simulated_fleet(count):
+    """Build a transport with `count` simulated hubs, and hubs to reach them."""
+    transport = InProcessTransport()
+    devices = {}
+    hubs = []
+    for number in range(count):
+        host = f"10.0.{number // 256}.{number % 256}"
+        devices[host] = SimulatedHub(f"7C:9E:BD:00:{number // 256:02X}:"
+                                     f"{number % 256:02X}")
+        transport.add_host(host, devices[host])
+        hubs.append(VegeHub(host, transport=transport))
+    return transport, devices, hubs
+
+
+@pytest.mark.asyncio
+async def test_simulated_fleet():
+    """Test driving many simulated hubs through the client without sockets."""
+    transport, devices, hubs = simulated_fleet(1000)
+    fleet = VegeHubFleet(hubs)
+    results = await fleet.info()
+    assert all(result.ok for result in results.values())
+    assert all(hub.num_sensors == 4 for hub in hubs)
+    assert hubs[1].mac_address == "7C9EBD000001"
+    assert transport.requests == 1000
+
+    hub = hubs[5]
+    assert await hub.setup("key", "http://server", retries=1)
+    config = devices[hub.ip_address].config
+    assert config["api_key"] == "key"
+    assert config["hub"]["server_url"] == "http://server"
+
+    assert await hub.set_actuator(1, 1, 60)
+    status = await hub.actuator_status()
+    assert (status[0].state, status[1].state) == (0, 1)
+    assert devices[hub.ip_address].actuators[1]["duration"] == 60
+    assert await hub.request_update()
+    assert devices[hub.ip_address].update_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_in_process_errors():
+    """Test that unknown hosts and error statuses fail like real requests."""
+    transport = InProcessTransport()
+    missing = VegeHub("10.9.0.1", transport=transport)
+    with pytest.raises(ConnectionError):
+        await missing.request_update()
+    assert missing.failure_counts == {"/api/update/send": 1}
+
+    async def failing(_method, _path, _payload):
+        return 500, None
+
+    transport.add_host("10.9.0.2", failing)
+    hub = VegeHub("10.9.0.2", transport=transport)
+    with pytest.raises(ConnectionError):
+        await hub.request_update()
+    assert hub.failure_counts == {"/api/update/send": 1}
+
+    transport.remove_host("10.9.0.2")
+    with pytest.raises(ConnectionError):
+        await hub.set_actuator(0, 0, 10)
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_shared_session():
+    """Test that a shared session is reused for every request."""
+    with aioresponses() as mocked:
+        mocked.post("http://10.0.0.1/api/info/get",
+                    payload={"wifi": {"mac_addr": "7C:9E:BD:00:00:01"}})
+        mocked.get("http://10.0.0.1/api/update/send", status=200)
+        async with aiohttp.ClientSession() as session:
+            transport = AiohttpTransport(session)
+            hub = VegeHub("10.0.0.1", transport=transport)
+            assert await hub.retrieve_mac_address()
+            assert await hub.request_update()
+            assert not session.closed
+        assert hub.mac_address == "7C9EBD000001"
+        assert hub.transport is transport
+
+
+def test_transport_is_abstract():
+    """Test that a transport must implement request."""
+    with pytest.raises(TypeError):
+        Transport()  # pylint: disable=abstract-class-instantiated
+
+    class Incomplete(Transport):  # pylint: disable=too-few-public-methods
+        """A transport without request."""
+
+    with pytest.raises(TypeError):
+        Incomplete()  # pylint: disable=abstract-class-instantiated
@@ -1,15 +1,20 @@
 """Basic tests for VegeHub package."""
 
+import asyncio
 from unittest.mock import AsyncMock, patch, Mock
 
 import aiohttp
 import pytest
 from aioresponses import aioresponses
+from yarl import URL
 
+from vegehub.helpers import therm200_transform, vh400_transform
 from vegehub.vegehub import VegeHub
 
 from aiohttp.client_exceptions import ClientConnectorError, ConnectionKey
 
+from .test_helpers import UPDATE_DATA
+
 IP_ADDR = "192.168.0.100"
 UNIQUE_ID = "aabbccddeeff"
 TEST_MAC = "AA:BB:CC:DD:EE:FF"
@@ -154,6 +159,26 @@ async def test_setup_success(basic_hub):
         assert basic_hub.sw_version == SW_VER
 
 
+@pytest.mark.asyncio
+async def test_get_hub_config(basic_hub):
+    """Test fetching the config as a HubConfig."""
+    with aioresponses() as mocked:
+        mocked.post(f"http://{IP_ADDR}/api/config/get",
+                    payload={
+                        "hub": {
+                            "server_url": TEST_SERVER,
+                            "server_type": 3
+                        },
+                        "api_key": TEST_API_KEY
+                    })
+        mocked.post(f"http://{IP_ADDR}/api/config/get", payload={"api_key": ""})
+        config = await basic_hub.get_hub_config()
+        assert (config.api_key, config.server_url,
+                config.server_type) == (TEST_API_KEY, TEST_SERVER, 3)
+        with pytest.raises(ValueError):
+            await basic_hub.get_hub_config()
+
+
 @pytest.mark.asyncio
 async def test_setup_failure_config_get(basic_hub):
     """Test the setup method sends the correct API key and server address."""
@@ -428,3 +453,133 @@ async def test_get_actuator_client_connector_error_fail(basic_hub):
                                                     os_error=os_error)
         with pytest.raises(ConnectionError):
             await basic_hub.actuator_states(retries=1)
+
+
+@pytest.mark.asyncio
+async def test_decode_update_with_sensor_types():
+    """Test decoding updates through the hub's compiled pipeline."""
+    hub = VegeHub(ip_address=IP_ADDR, sensor_types={0: "vh400"})
+    assert hub.pipeline is None
+    assert not hub.decode_update(UPDATE_DATA)
+
+    with aioresponses() as mocked:
+        mocked.post(f"http://{IP_ADDR}/api/info/get", payload=HUB_INFO_PAYLOAD)
+        await hub._get_device_info_with_retries()
+
+    data = hub.decode_update(UPDATE_DATA)
+    assert data["analog_0"] == vh400_transform(1.5)
+    assert data["analog_1"] == 1.45599997
+    assert data["battery"] == 9.314800262
+
+    hub.set_sensor_type(1, "therm200")
+    hub.set_sensor_type(0, "raw")
+    assert hub.sensor_types == {1: "therm200"}
+    data = hub.decode_update(UPDATE_DATA)
+    assert data["analog_0"] == 1.5
+    assert data["analog_1"] == therm200_transform(1.45599997)
+
+    with pytest.raises(KeyError):
+        hub.set_sensor_type(2, "nonexistent")
+
+
+@pytest.mark.asyncio
+async def test_requests_are_serialized(basic_hub):
+    """Test that concurrent calls go through the hub's request queue."""
+    with aioresponses() as mocked:
+        mocked.get(f"http://{IP_ADDR}/api/actuators/status",
+                   payload=ACTUATOR_INFO_PAYLOAD,
+                   repeat=True)
+        mocked.post(f"http://{IP_ADDR}/api/actuators/set", repeat=True)
+        await asyncio.gather(basic_hub.actuator_states(),
+                             basic_hub.actuator_states(),
+                             basic_hub.set_actuator(1, 0, 60))
+
+    metrics = basic_hub.queue_metrics
+    assert metrics["total_requests"] == 3
+    assert metrics["in_flight"] == 0
+    assert metrics["depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_set_actuator_coalesced():
+    """Test that rapid commands for one slot collapse into the last one."""
+    hub = VegeHub(ip_address=IP_ADDR, coalesce_window=0.01)
+    with aioresponses() as mocked:
+        mocked.post(f"http://{IP_ADDR}/api/actuators/set", repeat=True)
+        results = await asyncio.gather(hub.set_actuator(1, 0, 60),
+                                       hub.set_actuator(0, 0, 60),
+                                       hub.set_actuator(1, 0, 30),
+                                       hub.set_actuator(1, 1, 60))
+        calls = mocked.requests[("POST", URL(
+            f"http://{IP_ADDR}/api/actuators/set"))]
+
+    assert results == [True, True, True, True]
+    assert [call.kwargs["json"] for call in calls] == [{
+        "target": 0,
+        "duration": 30,
+        "state": 1
+    }, {
+        "target": 1,
+        "duration": 60,
+        "state": 1
+    }]
+    assert hub.coalesced_commands == 2
+
+
+@pytest.mark.asyncio
+async def test_set_actuator_coalesced_failure(basic_hub):
+    """Test that every coalesced caller sees the failure of the sent command."""
+    basic_hub.set_coalesce_window(0.01, slot=2)
+    with aioresponses() as mocked:
+        mocked.post(f"http://{IP_ADDR}/api/actuators/set", status=400)
+        results = await asyncio.gather(basic_hub.set_actuator(1, 2, 60),
+                                       basic_hub.set_actuator(0, 2, 60),
+                                       return_exceptions=True)
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_actuator_status_models(basic_hub):
+    """Test retrieving actuator states as models, and parsed hub info."""
+    with aioresponses() as mocked:
+        mocked.get(f"http://{IP_ADDR}/api/actuators/status",
+                   payload=ACTUATOR_INFO_PAYLOAD)
+        statuses = await basic_hub.actuator_status()
+    assert statuses[0].slot == 0
+    assert statuses[0].last_run == 1730911079
+
+    assert basic_hub.hub_info is None
+    hub = VegeHub(ip_address=IP_ADDR, info=HUB_INFO_PAYLOAD["hub"])
+    assert hub.hub_info.num_sensors == NUM_CHANNELS
+    assert hub.num_actuators == NUM_ACTUATORS
+
+
+@pytest.mark.asyncio
+async def test_failure_counts():
+    """Test that failed requests are counted per endpoint."""
+    hub = VegeHub(ip_address="192.168.0.99")
+    with aioresponses() as mocked:
+        mocked.get("http://192.168.0.99/api/update/send", status=500)
+        with pytest.raises(ConnectionError):
+            await hub.request_update()
+    assert hub.failure_counts == {"/api/update/send": 1}
+
+
+@pytest.mark.asyncio
+async def test_get_info_malformed_is_retried():
+    """Test that info that cannot be parsed fails like a bad response."""
+    hub = VegeHub(ip_address="192.168.0.98")
+    url = "http://192.168.0.98/api/info/get"
+    malformed = {"hub": dict(HUB_INFO_PAYLOAD["hub"], num_channels="four")}
+    with aioresponses() as mocked:
+        mocked.post(url, payload=malformed)
+        with pytest.raises(ConnectionError):
+            await hub.get_info()
+    assert hub.info is None
+    assert hub.failure_counts == {"/api/info/get": 1}
+
+    with aioresponses() as mocked:
+        mocked.post(url, payload=malformed)
+        mocked.post(url, payload=HUB_INFO_PAYLOAD)
+        assert await hub.get_info(retries=1) == HUB_INFO_PAYLOAD["hub"]
+    assert hub.num_sensors == NUM_CHANNELS
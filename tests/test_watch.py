@@ -0,0 +1,121 @@
+"""Tests for watch.py."""
+
+import asyncio
+
+import pytest
+from aioresponses import aioresponses
+
+from vegehub.vegehub import VegeHub
+from vegehub.watch import OVERFLOW_BLOCK, Reading, ReadingBuffer
+from .test_helpers import UPDATE_DATA, UPDATE_DATA_2
+from .test_vegehub import HUB_INFO_PAYLOAD, IP_ADDR
+
+
+def reading(number):
+    """Build a dummy reading."""
+    return Reading("7C9EBD4B49D8", {"analog_0": number}, number, 0.0, {})
+
+
+@pytest.fixture(name="info_hub")
+def fixture_info_hub():
+    """Fixture for a hub whose info is already known."""
+    return VegeHub(ip_address=IP_ADDR,
+                   mac_address="7C9EBD4B49D8",
+                   info=HUB_INFO_PAYLOAD["hub"])
+
+
+@pytest.mark.asyncio
+async def test_buffer_drop_oldest():
+    """Test that a full buffer drops its oldest reading."""
+    buffer = ReadingBuffer(maxsize=2)
+    for number in range(4):
+        await buffer.put(reading(number))
+    assert buffer.dropped == 2
+    assert (await buffer.get()).values == {"analog_0": 2}
+    assert (await buffer.get()).values == {"analog_0": 3}
+
+
+@pytest.mark.asyncio
+async def test_buffer_block():
+    """Test that a full blocking buffer makes producers wait."""
+    buffer = ReadingBuffer(maxsize=1, overflow=OVERFLOW_BLOCK)
+    await buffer.put(reading(0))
+    producer = asyncio.create_task(buffer.put(reading(1)))
+    await asyncio.sleep(0)
+    assert not producer.done()
+    assert (await buffer.get()).send_time == 0
+    await producer
+    assert (await buffer.get()).send_time == 1
+    assert buffer.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_close_releases_blocked_producer(info_hub):
+    """Test that closing a watcher releases a push waiting for room."""
+    watcher = info_hub.watch(maxsize=1, overflow=OVERFLOW_BLOCK)
+    await info_hub.handle_push(UPDATE_DATA)
+    producer = asyncio.create_task(info_hub.handle_push(UPDATE_DATA_2))
+    await asyncio.sleep(0)
+    assert not producer.done()
+
+    await watcher.aclose()
+    async with asyncio.timeout(1):
+        await producer
+    assert watcher.buffer.dropped == 1
+    await watcher.buffer.put(reading(2))
+    assert len(watcher.buffer) == 1
+
+
+def test_buffer_bad_policy():
+    """Test that unknown overflow policies are rejected."""
+    with pytest.raises(ValueError):
+        ReadingBuffer(overflow="explode")
+
+
+@pytest.mark.asyncio
+async def test_hub_watch(info_hub):
+    """Test iterating over pushed readings and clean shutdown."""
+    watcher = info_hub.watch()
+
+    await info_hub.handle_push(UPDATE_DATA)
+    await info_hub.handle_push(UPDATE_DATA_2)
+    first = await watcher.__anext__()
+    second = await watcher.__anext__()
+    assert first.mac == "7C9EBD4B49D8"
+    assert first.values["analog_0"] == 1.5
+    assert first.send_time == UPDATE_DATA["send_time"]
+    assert second.values["battery"] == 9.3588
+
+    await watcher.aclose()
+    assert not info_hub._watchers
+
+
+@pytest.mark.asyncio
+async def test_hub_watch_attaches_immediately(info_hub):
+    """Test that readings pushed before iteration starts are kept."""
+    async with info_hub.watch() as watcher:
+        assert info_hub._watchers
+        await info_hub.handle_push(UPDATE_DATA)
+        assert (await watcher.__anext__()).values["analog_0"] == 1.5
+    assert not info_hub._watchers
+    with pytest.raises(StopAsyncIteration):
+        await watcher.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_hub_watch_polling(info_hub):
+    """Test that polling asks the hub for updates until cancelled."""
+    with aioresponses() as mocked:
+        mocked.get(f"http://{IP_ADDR}/api/update/send", repeat=True)
+
+        async def consume():
+            async for item in info_hub.watch(poll_interval=0.01):
+                return item
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.03)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert mocked.requests
+    assert not info_hub._watchers
@@ -1,9 +1,78 @@
-"""Package for VegeHub communication."""
-
-from vegehub.vegehub import VegeHub
-from vegehub.helpers import (
-    vh400_transform,
-    therm200_transform,
-    update_data_to_latest_dict,
-    update_data_to_ha_dict
-)
+"""Package for VegeHub communication.
+
+Names are imported from their submodules on first use, so that importing
+the helpers (e.g. in decode workers) does not pull in aiohttp.
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from vegehub.vegehub import VegeHub
+    from vegehub.helpers import (
+        vh400_transform,
+        therm200_transform,
+        update_data_to_latest_dict,
+        update_data_to_latest_columns,
+        iter_update_columns,
+        update_data_to_ha_dict
+    )
+    from vegehub.store import SampleStore
+    from vegehub.aggregates import SensorAggregator
+    from vegehub.batch import decode_batch, async_decode_batch
+    from vegehub.delta import DeltaDecoder
+    from vegehub.dedupe import SampleFilter
+    from vegehub.sink import SQLiteSink
+    from vegehub.transport import (Transport, AiohttpTransport,
+                                   InProcessTransport, SimulatedHub)
+    from vegehub.sensors import SensorPipeline, register_sensor_type
+    from vegehub.fleet import VegeHubFleet, FleetResult
+    from vegehub.audit import ConfigAudit, AuditResult
+    from vegehub.health import HealthTracker
+    from vegehub.models import HubInfo, HubConfig, ActuatorStatus, UpdatePayload
+
+_EXPORTS = {
+    "VegeHub": "vegehub.vegehub",
+    "vh400_transform": "vegehub.helpers",
+    "therm200_transform": "vegehub.helpers",
+    "update_data_to_latest_dict": "vegehub.helpers",
+    "update_data_to_latest_columns": "vegehub.helpers",
+    "iter_update_columns": "vegehub.helpers",
+    "update_data_to_ha_dict": "vegehub.helpers",
+    "SampleStore": "vegehub.store",
+    "SensorAggregator": "vegehub.aggregates",
+    "decode_batch": "vegehub.batch",
+    "async_decode_batch": "vegehub.batch",
+    "DeltaDecoder": "vegehub.delta",
+    "SampleFilter": "vegehub.dedupe",
+    "SQLiteSink": "vegehub.sink",
+    "Transport": "vegehub.transport",
+    "AiohttpTransport": "vegehub.transport",
+    "InProcessTransport": "vegehub.transport",
+    "SimulatedHub": "vegehub.transport",
+    "SensorPipeline": "vegehub.sensors",
+    "register_sensor_type": "vegehub.sensors",
+    "VegeHubFleet": "vegehub.fleet",
+    "FleetResult": "vegehub.fleet",
+    "ConfigAudit": "vegehub.audit",
+    "AuditResult": "vegehub.audit",
+    "HealthTracker": "vegehub.health",
+    "HubInfo": "vegehub.models",
+    "HubConfig": "vegehub.models",
+    "ActuatorStatus": "vegehub.models",
+    "UpdatePayload": "vegehub.models",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
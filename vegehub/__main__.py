@@ -0,0 +1,6 @@
+"""Run the VegeHub command line tool with python -m vegehub."""
+import sys
+
+from vegehub.cli import main
+
+sys.exit(main())
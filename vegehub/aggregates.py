@@ -0,0 +1,220 @@
+"""Incremental rolling statistics and downsampled series for sensor values."""
+from collections import deque
+from typing import Any
+
+DEFAULT_WINDOWS = (3600, 86400)
+DEFAULT_BUCKET_SECONDS = 3600
+DEFAULT_MAX_BUCKETS = 24 * 7
+
+
+class RollingWindow():
+    """Min, max, mean and rate over the last `seconds` of samples.
+
+    Min and max are tracked with monotonic deques, so every update is
+    amortized O(1) and every query is a single lookup. This relies on
+    samples arriving in time order; older samples are rejected.
+    """
+
+    def __init__(self, seconds: int) -> None:
+        self.seconds = seconds
+        self._samples: deque[tuple[int, float]] = deque()
+        self._mins: deque[tuple[int, float]] = deque()
+        self._maxes: deque[tuple[int, float]] = deque()
+        self._total = 0.0
+
+    def add(self, timestamp: int, value: float) -> None:
+        """Add a sample and drop any that have fallen out of the window.
+
+        Raises ValueError if the sample is older than the newest one.
+        """
+        if self._samples and timestamp < self._samples[-1][0]:
+            raise ValueError(
+                f"Sample at {timestamp} is older than {self._samples[-1][0]}")
+        self._samples.append((timestamp, value))
+        self._total += value
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((timestamp, value))
+        while self._maxes and self._maxes[-1][1] <= value:
+            self._maxes.pop()
+        self._maxes.append((timestamp, value))
+        self._expire(timestamp - self.seconds)
+
+    def _expire(self, cutoff: int) -> None:
+        samples = self._samples
+        while samples and samples[0][0] <= cutoff:
+            self._total -= samples.popleft()[1]
+        while self._mins and self._mins[0][0] <= cutoff:
+            self._mins.popleft()
+        while self._maxes and self._maxes[0][0] <= cutoff:
+            self._maxes.popleft()
+
+    @property
+    def last_timestamp(self) -> int | None:
+        """Timestamp of the newest sample."""
+        return self._samples[-1][0] if self._samples else None
+
+    @property
+    def count(self) -> int:
+        """Number of samples in the window."""
+        return len(self._samples)
+
+    @property
+    def min(self) -> float | None:
+        """Smallest value in the window."""
+        return self._mins[0][1] if self._mins else None
+
+    @property
+    def max(self) -> float | None:
+        """Largest value in the window."""
+        return self._maxes[0][1] if self._maxes else None
+
+    @property
+    def mean(self) -> float | None:
+        """Average value in the window."""
+        if not self._samples:
+            return None
+        return self._total / len(self._samples)
+
+    @property
+    def rate(self) -> float | None:
+        """Change per second between the oldest and newest sample."""
+        if len(self._samples) < 2:
+            return None
+        first_t, first_v = self._samples[0]
+        last_t, last_v = self._samples[-1]
+        if last_t == first_t:
+            return None
+        return (last_v - first_v) / (last_t - first_t)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the current statistics as a dict."""
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "rate": self.rate,
+        }
+
+
+class Bucket():
+    """Summary of all samples that fell into one fixed time bucket."""
+
+    __slots__ = ("start", "min", "max", "total", "count")
+
+    def __init__(self, start: int, value: float) -> None:
+        self.start = start
+        self.min = value
+        self.max = value
+        self.total = value
+        self.count = 1
+
+    def add(self, value: float) -> None:
+        """Fold a sample into the bucket."""
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.total += value
+        self.count += 1
+
+    @property
+    def mean(self) -> float:
+        """Average value in the bucket."""
+        return self.total / self.count
+
+
+class BucketSeries():
+    """Downsampled series of fixed-width buckets, keeping the newest ones."""
+
+    def __init__(self,
+                 seconds: int = DEFAULT_BUCKET_SECONDS,
+                 max_buckets: int = DEFAULT_MAX_BUCKETS) -> None:
+        self.seconds = seconds
+        self._buckets: deque[Bucket] = deque(maxlen=max_buckets)
+
+    def add(self, timestamp: int, value: float) -> None:
+        """Fold a sample into its bucket, opening a new one if needed."""
+        start = timestamp - timestamp % self.seconds
+        if self._buckets and self._buckets[-1].start == start:
+            self._buckets[-1].add(value)
+        elif not self._buckets or self._buckets[-1].start < start:
+            self._buckets.append(Bucket(start, value))
+        else:
+            # Late sample, find its bucket among the ones still kept.
+            for bucket in reversed(self._buckets):
+                if bucket.start == start:
+                    bucket.add(value)
+                    break
+
+    @property
+    def buckets(self) -> list[Bucket]:
+        """All kept buckets, oldest first."""
+        return list(self._buckets)
+
+    @property
+    def latest(self) -> Bucket | None:
+        """The newest bucket."""
+        return self._buckets[-1] if self._buckets else None
+
+
+class SensorAggregator():
+    """Rolling windows and downsampled series for every entity of every hub."""
+
+    def __init__(self,
+                 windows: tuple[int, ...] = DEFAULT_WINDOWS,
+                 bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+                 max_buckets: int = DEFAULT_MAX_BUCKETS) -> None:
+        self._window_sizes = windows
+        self._bucket_seconds = bucket_seconds
+        self._max_buckets = max_buckets
+        self._windows: dict[tuple[str, str], dict[int, RollingWindow]] = {}
+        self._series: dict[tuple[str, str], BucketSeries] = {}
+        self.late_samples = 0
+
+    def add(self, mac: str, entity: str, timestamp: int,
+            value: int | float) -> None:
+        """Feed one sample to every aggregate of its entity.
+
+        A sample older than the newest one seen for its entity only goes to
+        its bucket, as the rolling windows have already moved past it.
+        """
+        key = (mac.lower(), entity)
+        windows = self._windows.get(key)
+        if windows is None:
+            windows = {
+                seconds: RollingWindow(seconds)
+                for seconds in self._window_sizes
+            }
+            self._windows[key] = windows
+            self._series[key] = BucketSeries(self._bucket_seconds,
+                                             self._max_buckets)
+        value = float(value)
+        for window in windows.values():
+            last = window.last_timestamp
+            if last is not None and timestamp < last:
+                self.late_samples += 1
+                break
+            window.add(timestamp, value)
+        self._series[key].add(timestamp, value)
+
+    def update(self, mac: str, values: dict[str, Any],
+               timestamp: int) -> None:
+        """Feed every numeric value of an update_data_to_ha_dict result."""
+        for entity, value in values.items():
+            if isinstance(value, (int, float)):
+                self.add(mac, entity, timestamp, value)
+
+    def window(self, mac: str, entity: str, seconds: int) -> RollingWindow | None:
+        """Look up the rolling window of the given size for an entity."""
+        windows = self._windows.get((mac.lower(), entity))
+        if windows is None:
+            return None
+        return windows.get(seconds)
+
+    def series(self, mac: str, entity: str) -> BucketSeries | None:
+        """Look up the downsampled series for an entity."""
+        return self._series.get((mac.lower(), entity))
+
+    def entities(self) -> list[tuple[str, str]]:
+        """List the (mac, entity) pairs that have been aggregated."""
+        return list(self._windows)
@@ -0,0 +1,172 @@
+"""Fleet wide auditing of hub configuration against an expected template."""
+import hashlib
+import json
+import time
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit
+
+from vegehub.fleet import VegeHubFleet
+from vegehub.vegehub import VegeHub
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TTL = 300.0
+
+Drift = dict[str, tuple[Any, Any]]
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                       parts.path.rstrip("/"), parts.query, ""))
+
+
+def normalize_config(config: dict[str, Any],
+                     prefix: str = "") -> dict[str, Any]:
+    """Flatten a config into dotted keys with comparable values.
+
+    Nested sections become "section.key" entries, strings are stripped and
+    server URLs lose case and trailing slash differences, so configs that
+    behave the same compare equal.
+    """
+    flat: dict[str, Any] = {}
+    for key, value in config.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(normalize_config(value, f"{name}."))
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if key == "server_url" and value:
+                value = _normalize_url(value)
+        flat[name] = value
+    return flat
+
+
+def config_fingerprint(config: dict[str, Any],
+                       keys: list[str] | None = None) -> str:
+    """A short hash of a normalized config, or of only the given keys."""
+    flat = normalize_config(config)
+    if keys is not None:
+        flat = {key: flat.get(key) for key in keys}
+    encoded = json.dumps(flat, sort_keys=True, separators=(",", ":"),
+                         default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+def config_drift(config: dict[str, Any], expected: dict[str, Any]) -> Drift:
+    """Compare a config with a template, as {key: (expected, actual)}.
+
+    Only keys set in the template are checked; keys missing from the
+    config are reported with an actual value of None.
+    """
+    flat = normalize_config(config)
+    return {
+        key: (value, flat.get(key))
+        for key, value in normalize_config(expected).items()
+        if flat.get(key) != value
+    }
+
+
+class AuditResult():
+    """One hub's configuration compared against the template."""
+
+    __slots__ = ("hub", "fingerprint", "drift", "error", "cached")
+
+    def __init__(self,
+                 hub: VegeHub,
+                 fingerprint: str | None = None,
+                 drift: Drift | None = None,
+                 error: BaseException | None = None,
+                 cached: bool = False) -> None:
+        self.hub = hub
+        self.fingerprint = fingerprint
+        self.drift = drift or {}
+        self.error = error
+        self.cached = cached
+
+    @property
+    def ok(self) -> bool:
+        """Whether the config was fetched and matches the template."""
+        return self.error is None and not self.drift
+
+    def __repr__(self) -> str:
+        return (f"AuditResult(hub={self.hub.ip_address!r}, ok={self.ok}, "
+                f"drift={self.drift!r})")
+
+
+class ConfigAudit():
+    """Fetch the configs of a fleet concurrently and report drift.
+
+    At most `concurrency` hubs are asked at once. Configs fetched within the
+    last `ttl` seconds are reused instead of asking the hub again; call
+    invalidate() after changing a hub's config.
+    """
+
+    def __init__(self,
+                 fleet: VegeHubFleet,
+                 expected: dict[str, Any],
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 ttl: float = DEFAULT_TTL,
+                 fingerprint_keys: list[str] | None = None) -> None:
+        self._fleet = fleet
+        self._expected = expected
+        self._concurrency = concurrency
+        self._ttl = ttl
+        self._fingerprint_keys = fingerprint_keys
+        self._cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        self.cache_hits = 0
+        self.fetches = 0
+
+    def invalidate(self, hub: VegeHub | None = None) -> None:
+        """Forget the cached config of one hub, or of every hub."""
+        if hub is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(hub.ip_address, None)
+
+    async def run(self,
+                  timeout: float | None = None,
+                  retries: int = 0) -> dict[str, AuditResult]:
+        """Audit every hub in the fleet, keyed like VegeHubFleet.run."""
+        results = await self._fleet.run(
+            lambda hub: self._fetch(hub, retries),
+            timeout,
+            limit=self._concurrency)
+        report = {}
+        for key, result in results.items():
+            if not result.ok:
+                report[key] = AuditResult(
+                    result.hub,
+                    error=result.error or TimeoutError())
+                continue
+            config, cached = result.value
+            report[key] = AuditResult(
+                result.hub,
+                config_fingerprint(config, self._fingerprint_keys),
+                config_drift(config, self._expected),
+                cached=cached)
+        return report
+
+    async def _fetch(self, hub: VegeHub,
+                     retries: int) -> tuple[dict[str, Any], bool]:
+        now = time.monotonic()
+        entry = self._cache.get(hub.ip_address)
+        if entry is not None and now - entry[0] < self._ttl:
+            self.cache_hits += 1
+            return entry[1], True
+
+        self.fetches += 1
+        config = await hub.get_config(retries)
+        if not config:
+            raise ValueError("Hub returned no config")
+        self._cache[hub.ip_address] = (time.monotonic(), config)
+        return config, False
+
+
+def group_by_fingerprint(
+        report: dict[str, AuditResult]) -> dict[str, list[str]]:
+    """Group hubs by config fingerprint, for a fleet overview."""
+    groups: dict[str, list[str]] = {}
+    for key, result in report.items():
+        groups.setdefault(result.fingerprint or "error", []).append(key)
+    return groups
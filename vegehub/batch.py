@@ -0,0 +1,112 @@
+"""Batch decoding of stored update payloads across a process pool."""
+import asyncio
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any
+
+from vegehub.helpers import update_data_to_ha_dict
+
+DEFAULT_CHUNK_SIZE = 2000
+# Below this many payloads, pickling them to worker processes costs more
+# than decoding them in place.
+DEFAULT_MIN_PARALLEL = 5000
+
+Transforms = dict[str, Callable[[Any], Any]]
+
+
+def decode_payload(data: dict[str, Any], num_sensors: int, num_actuators: int,
+                   is_ac: bool,
+                   transforms: Transforms | None = None) -> dict[str, Any]:
+    """Decode one payload to its HA dict, applying per-entity transforms."""
+    decoded = update_data_to_ha_dict(data, num_sensors, num_actuators, is_ac)
+    if transforms:
+        for entity, transform in transforms.items():
+            if entity in decoded:
+                decoded[entity] = transform(decoded[entity])
+    return decoded
+
+
+def _decode_chunk(chunk: Sequence[dict[str, Any]], num_sensors: int,
+                  num_actuators: int, is_ac: bool,
+                  transforms: Transforms | None) -> list[dict[str, Any]]:
+    """Decode one chunk of payloads, applying per-entity transforms."""
+    return [
+        decode_payload(data, num_sensors, num_actuators, is_ac, transforms)
+        for data in chunk
+    ]
+
+
+def _chunks(payloads: Sequence[dict[str, Any]],
+            chunk_size: int) -> list[Sequence[dict[str, Any]]]:
+    return [
+        payloads[i:i + chunk_size] for i in range(0, len(payloads), chunk_size)
+    ]
+
+
+def decode_batch(payloads: Sequence[dict[str, Any]],
+                 num_sensors: int,
+                 num_actuators: int,
+                 is_ac: bool,
+                 transforms: Transforms | None = None,
+                 executor: Executor | None = None,
+                 max_workers: int | None = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 min_parallel: int = DEFAULT_MIN_PARALLEL) -> list[dict[str, Any]]:
+    """Decode many raw payloads, returning their HA dicts in input order.
+
+    Transforms map entity names (e.g. "analog_0") to module level functions
+    such as vh400_transform, so they can be sent to worker processes.
+    """
+    if len(payloads) < min_parallel:
+        return _decode_chunk(payloads, num_sensors, num_actuators, is_ac,
+                             transforms)
+
+    chunks = _chunks(payloads, chunk_size)
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return _map_chunks(pool, chunks, num_sensors, num_actuators,
+                               is_ac, transforms)
+    return _map_chunks(executor, chunks, num_sensors, num_actuators, is_ac,
+                       transforms)
+
+
+def _map_chunks(executor: Executor, chunks: list[Sequence[dict[str, Any]]],
+                num_sensors: int, num_actuators: int, is_ac: bool,
+                transforms: Transforms | None) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    count = len(chunks)
+    for decoded in executor.map(_decode_chunk, chunks, [num_sensors] * count,
+                                [num_actuators] * count, [is_ac] * count,
+                                [transforms] * count):
+        results.extend(decoded)
+    return results
+
+
+async def async_decode_batch(
+        payloads: Sequence[dict[str, Any]],
+        num_sensors: int,
+        num_actuators: int,
+        is_ac: bool,
+        transforms: Transforms | None = None,
+        executor: Executor | None = None,
+        max_workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        min_parallel: int = DEFAULT_MIN_PARALLEL) -> list[dict[str, Any]]:
+    """Decode many raw payloads without blocking the event loop."""
+    if len(payloads) < min_parallel:
+        return _decode_chunk(payloads, num_sensors, num_actuators, is_ac,
+                             transforms)
+
+    loop = asyncio.get_running_loop()
+    chunks = _chunks(payloads, chunk_size)
+    pool = executor or ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        decoded = await asyncio.gather(*[
+            loop.run_in_executor(pool, _decode_chunk, chunk, num_sensors,
+                                 num_actuators, is_ac, transforms)
+            for chunk in chunks
+        ])
+    finally:
+        if executor is None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    return [item for chunk in decoded for item in chunk]
@@ -0,0 +1,186 @@
+"""Command line tool for running commands across many hubs at once.
+
+Results are printed as one JSON object per line, as each hub finishes:
+
+    python -m vegehub info 192.168.0.100 192.168.0.101
+    python -m vegehub actuator-status 192.168.0.0/24 --concurrency 64
+    python -m vegehub set-actuator 192.168.0.100 --slot 0 --state 1 --duration 60
+"""
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+import ipaddress
+import json
+import sys
+import time
+from typing import Any, TextIO
+
+from vegehub.vegehub import VegeHub
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_TIMEOUT = 10.0
+
+Command = Callable[[VegeHub, argparse.Namespace], Awaitable[Any]]
+
+
+async def _info(hub: VegeHub, args: argparse.Namespace) -> Any:
+    info = await hub.get_info(args.retries)
+    return {"mac": hub.mac_address, "info": info}
+
+
+async def _mac(hub: VegeHub, args: argparse.Namespace) -> Any:
+    if not await hub.retrieve_mac_address(args.retries):
+        raise ValueError("MAC address not found")
+    return hub.mac_address
+
+
+async def _actuator_status(hub: VegeHub, args: argparse.Namespace) -> Any:
+    return await hub.actuator_states(args.retries)
+
+
+async def _set_actuator(hub: VegeHub, args: argparse.Namespace) -> Any:
+    return await hub.set_actuator(args.state, args.slot, args.duration,
+                                  args.retries)
+
+
+async def _request_update(hub: VegeHub, _args: argparse.Namespace) -> Any:
+    if not await hub.request_update():
+        raise ValueError("Update not requested")
+    return True
+
+
+async def _setup(hub: VegeHub, args: argparse.Namespace) -> Any:
+    if not await hub.setup(args.api_key, args.server, args.retries):
+        raise ValueError("Config not applied")
+    return True
+
+
+COMMANDS: dict[str, Command] = {
+    "info": _info,
+    "mac": _mac,
+    "actuator-status": _actuator_status,
+    "set-actuator": _set_actuator,
+    "request-update": _request_update,
+    "setup": _setup,
+}
+
+
+def expand_hosts(targets: Iterable[str]) -> Iterator[str]:
+    """Expand IP addresses, hostnames and CIDR ranges into single hosts."""
+    for target in targets:
+        target = target.strip()
+        if not target or target.startswith("#"):
+            continue
+        if "/" in target:
+            network = ipaddress.ip_network(target, strict=False)
+            if network.num_addresses == 1:
+                yield str(network.network_address)
+            else:
+                yield from (str(host) for host in network.hosts())
+        else:
+            yield target
+
+
+async def run_command(command: Command,
+                      hosts: Iterable[str],
+                      args: argparse.Namespace,
+                      concurrency: int = DEFAULT_CONCURRENCY,
+                      timeout: float = DEFAULT_TIMEOUT,
+                      output: TextIO | None = None) -> tuple[int, int]:
+    """Run a command on every host, writing results as they complete.
+
+    At most `concurrency` hubs are contacted at once. Returns the number of
+    hubs that succeeded and failed. Results go to stdout unless `output`
+    is given.
+    """
+    stream = output or sys.stdout
+    pending = iter(hosts)
+    counts = [0, 0]
+
+    async def worker() -> None:
+        for host in pending:
+            result: dict[str, Any] = {"hub": host}
+            start = time.monotonic()
+            try:
+                async with asyncio.timeout(timeout):
+                    result["result"] = await command(VegeHub(host), args)
+                result["ok"] = True
+            except TimeoutError:
+                result["ok"] = False
+                result["error"] = "timed out"
+            except Exception as err:  # pylint: disable=broad-except
+                result["ok"] = False
+                result["error"] = type(err).__name__
+                if str(err):
+                    result["error"] += f": {err}"
+            result["elapsed"] = round(time.monotonic() - start, 3)
+            counts[0 if result["ok"] else 1] += 1
+            stream.write(json.dumps(result, default=str) + "\n")
+            stream.flush()
+
+    await asyncio.gather(*[worker() for _ in range(max(concurrency, 1))])
+    return counts[0], counts[1]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the command line tool."""
+    parser = argparse.ArgumentParser(
+        prog="python -m vegehub",
+        description="Run a command on many VegeHubs concurrently.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("hosts",
+                        nargs="*",
+                        help="IP addresses, hostnames or CIDR ranges")
+    common.add_argument("-f",
+                        "--file",
+                        help="read more hosts from a file, one per line")
+    common.add_argument("-c",
+                        "--concurrency",
+                        type=int,
+                        default=DEFAULT_CONCURRENCY,
+                        help="hubs to contact at once")
+    common.add_argument("-t",
+                        "--timeout",
+                        type=float,
+                        default=DEFAULT_TIMEOUT,
+                        help="seconds allowed per hub")
+    common.add_argument("-r", "--retries", type=int, default=0)
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("info", "mac", "actuator-status", "request-update"):
+        commands.add_parser(name, parents=[common])
+    set_actuator = commands.add_parser("set-actuator", parents=[common])
+    set_actuator.add_argument("--slot", type=int, required=True)
+    set_actuator.add_argument("--state", type=int, required=True)
+    set_actuator.add_argument("--duration", type=int, required=True)
+    setup = commands.add_parser("setup", parents=[common])
+    setup.add_argument("--api-key", required=True)
+    setup.add_argument("--server", required=True)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    targets = list(args.hosts)
+    if args.file:
+        try:
+            with open(args.file, encoding="utf-8") as host_file:
+                targets.extend(host_file.read().splitlines())
+        except OSError as err:
+            parser.error(f"cannot read hosts file: {err}")
+
+    # Expand every target first, so a bad one stops the run before any hub
+    # is contacted.
+    try:
+        hosts = list(expand_hosts(targets))
+    except ValueError as err:
+        parser.error(str(err))
+    if not hosts:
+        parser.error("no hosts given")
+
+    _, failed = asyncio.run(
+        run_command(COMMANDS[args.command], hosts, args, args.concurrency,
+                    args.timeout))
+    return 1 if failed else 0
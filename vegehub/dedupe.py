@@ -0,0 +1,105 @@
+"""Suppression of duplicate and out of order samples using high-water marks."""
+from datetime import datetime, timezone
+from typing import Any
+
+SAMPLE_NEW = 0
+SAMPLE_DUPLICATE = 1
+SAMPLE_LATE = 2
+
+
+def _send_time_to_sample_time(send_time: Any) -> str:
+    """Format a send_time like a sample "t", for samples that lack one."""
+    try:
+        moment = datetime.fromtimestamp(int(send_time), tz=timezone.utc)
+    except (TypeError, ValueError, OverflowError):
+        return ""
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class SampleFilter():
+    """Track the newest sample seen per hub and slot, and drop anything older.
+
+    Hubs stamp samples with fixed-width ISO 8601 UTC times, so they are
+    compared as strings. A sample at the high-water mark is a duplicate, one
+    before it is late. Memory grows with the number of slots, not samples.
+    """
+
+    def __init__(self) -> None:
+        self._marks: dict[tuple[str, int], str] = {}
+        self._send_times: dict[str, int] = {}
+        self.accepted = 0
+        self.duplicates = 0
+        self.late = 0
+        self.stale_payloads = 0
+
+    def check(self, mac: str, slot: int, sample_time: str) -> int:
+        """Classify one sample (mac in upper case), advancing the mark if new."""
+        key = (mac, slot)
+        mark = self._marks.get(key)
+        if mark is None or sample_time > mark:
+            self._marks[key] = sample_time
+            self.accepted += 1
+            return SAMPLE_NEW
+        if sample_time == mark:
+            self.duplicates += 1
+            return SAMPLE_DUPLICATE
+        self.late += 1
+        return SAMPLE_LATE
+
+    def filter_update(
+            self, data: dict[str, Any]
+    ) -> tuple[dict[str, Any], list[tuple[int, dict[str, Any]]]]:
+        """Remove already seen samples from a raw update.
+
+        Returns a copy of the update holding only new samples (slots left
+        with none are dropped), and a list of (slot, sample) for samples
+        that arrived after newer ones from the same slot.
+        """
+        if "sensors" not in data or "mac" not in data:
+            return data, []
+
+        mac = data["mac"].upper()
+        send_time = data.get("send_time")
+        if send_time is not None:
+            last_send_time = self._send_times.get(mac)
+            if last_send_time is not None and send_time <= last_send_time:
+                self.stale_payloads += 1
+            else:
+                self._send_times[mac] = send_time
+        fallback_time: str | None = None
+
+        sensors = []
+        late: list[tuple[int, dict[str, Any]]] = []
+        for sensor in data["sensors"]:
+            slot = sensor.get("slot", 0)
+            fresh = []
+            for sample in sensor.get("samples", []):
+                sample_time = sample.get("t")
+                if not sample_time:
+                    if fallback_time is None:
+                        fallback_time = _send_time_to_sample_time(send_time)
+                    sample_time = fallback_time
+                status = self.check(mac, slot, sample_time)
+                if status == SAMPLE_NEW:
+                    fresh.append(sample)
+                elif status == SAMPLE_LATE:
+                    late.append((slot, sample))
+            if fresh:
+                sensors.append(dict(sensor, samples=fresh))
+
+        return dict(data, sensors=sensors), late
+
+    def last_sample_time(self, mac: str, slot: int) -> str | None:
+        """The newest sample time seen for a hub's slot."""
+        return self._marks.get((mac.upper(), slot))
+
+    def last_send_time(self, mac: str) -> int | None:
+        """The newest send_time seen from a hub."""
+        return self._send_times.get(mac.upper())
+
+    def forget(self, mac: str) -> None:
+        """Drop all marks for a hub, e.g. after its clock was reset."""
+        mac = mac.upper()
+        self._send_times.pop(mac, None)
+        for key in [key for key in self._marks if key[0] == mac]:
+            del self._marks[key]
@@ -0,0 +1,79 @@
+"""Stateful update decoding that only reports values that changed."""
+from typing import Any
+
+from vegehub.helpers import update_data_to_ha_dict
+
+
+class DeltaDecoder():
+    """Decode updates for one hub, returning only entities whose value changed.
+
+    Optional deadbands suppress small changes on noisy channels. An absolute
+    deadband is in the entity's own units, a relative one is a fraction of
+    the last emitted value. Changes are measured against the last emitted
+    value, so slow drift is still reported once it exceeds the deadband.
+    """
+
+    def __init__(self,
+                 num_sensors: int,
+                 num_actuators: int,
+                 is_ac: bool,
+                 deadbands: dict[str, float] | None = None,
+                 relative_deadbands: dict[str, float] | None = None) -> None:
+        self.num_sensors = num_sensors
+        self.num_actuators = num_actuators
+        self.is_ac = is_ac
+        self.deadbands = deadbands or {}
+        self.relative_deadbands = relative_deadbands or {}
+        self._last: dict[str, Any] = {}
+        self.emitted = 0
+        self.suppressed = 0
+        self.suppressed_by_entity: dict[str, int] = {}
+
+    @property
+    def state(self) -> dict[str, Any]:
+        """The last emitted value of every entity."""
+        return dict(self._last)
+
+    def resync(self) -> None:
+        """Forget emitted values so the next update is reported in full."""
+        self._last.clear()
+
+    def decode(self,
+               data: dict[str, Any],
+               full: bool = False) -> dict[str, Any]:
+        """Decode a raw update, returning changed entities (or all if full)."""
+        values = update_data_to_ha_dict(data, self.num_sensors,
+                                        self.num_actuators, self.is_ac)
+        return self.diff(values, full)
+
+    def diff(self, values: dict[str, Any], full: bool = False) -> dict[str, Any]:
+        """Compare already decoded values against the last emitted ones."""
+        if full:
+            self._last.update(values)
+            self.emitted += len(values)
+            return values
+
+        changed = {}
+        for entity, value in values.items():
+            if entity in self._last and not self._changed(
+                    entity, self._last[entity], value):
+                self.suppressed += 1
+                self.suppressed_by_entity[entity] = (
+                    self.suppressed_by_entity.get(entity, 0) + 1)
+                continue
+            changed[entity] = value
+            self._last[entity] = value
+        self.emitted += len(changed)
+        return changed
+
+    def _changed(self, entity: str, last: Any, value: Any) -> bool:
+        if not (isinstance(last, (int, float))
+                and isinstance(value, (int, float))):
+            return last != value
+        delta = abs(value - last)
+        if entity in self.deadbands and delta <= self.deadbands[entity]:
+            return False
+        if (entity in self.relative_deadbands
+                and delta <= abs(last) * self.relative_deadbands[entity]):
+            return False
+        return value != last
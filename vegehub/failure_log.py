@@ -0,0 +1,122 @@
+"""Aggregated, rate limited logging of request failures."""
+import asyncio
+import logging
+import time
+
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 10
+DEFAULT_SUMMARY_INTERVAL = 60.0
+
+
+class FailureLog():
+    """Log failures per (hub, endpoint), collapsing repeats into summaries.
+
+    The first failure for a hub and endpoint in each summary interval is
+    logged as usual, as long as the token bucket (`rate` lines per second,
+    up to `burst` at once) allows it. Everything else is counted and
+    reported in one summary line per hub and endpoint once the interval has
+    passed. When failures happen inside an event loop, the summary is
+    scheduled on it, so it is logged even if no further failure arrives;
+    otherwise it waits for the next failure or a call to flush(). Counts
+    are kept even when the logger is disabled.
+    """
+
+    def __init__(self,
+                 logger: logging.Logger,
+                 rate: float = DEFAULT_RATE,
+                 burst: int = DEFAULT_BURST,
+                 summary_interval: float = DEFAULT_SUMMARY_INTERVAL) -> None:
+        self._logger = logger
+        self.rate = rate
+        self.burst = burst
+        self.summary_interval = summary_interval
+        self.counts: dict[tuple[str, str], int] = {}
+        self._suppressed: dict[tuple[str, str], int] = {}
+        self._logged: set[tuple[str, str]] = set()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._interval_start = self._last_refill
+        self._timer: asyncio.TimerHandle | None = None
+        # The loop the timer runs on. Hubs on other loops, e.g. in a later
+        # asyncio.run, share this log, so the timer is moved when it changes.
+        self._timer_loop: asyncio.AbstractEventLoop | None = None
+
+    def error(self, hub: str, endpoint: str, msg: str, *args: object) -> None:
+        """Count a failure and log it unless it is rate limited or repeated."""
+        key = (hub, endpoint)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if not self._logger.isEnabledFor(logging.ERROR):
+            return
+
+        now = time.monotonic()
+        if now - self._interval_start >= self.summary_interval:
+            self._summarize(now)
+        if key not in self._logged and self._take_token(now):
+            self._logged.add(key)
+            self._logger.error(msg, *args)
+        else:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            self._schedule_summary(now)
+
+    def flush(self) -> None:
+        """Log summaries of suppressed failures now."""
+        self._summarize(time.monotonic())
+
+    def hub_counts(self, hub: str) -> dict[str, int]:
+        """Failure counts per endpoint for one hub."""
+        return {
+            endpoint: count
+            for (key_hub, endpoint), count in self.counts.items()
+            if key_hub == hub
+        }
+
+    def reset(self) -> None:
+        """Clear all counts and suppressed failures, and start a new interval."""
+        self.counts.clear()
+        self._suppressed.clear()
+        self._logged.clear()
+        self._cancel_summary()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._interval_start = self._last_refill
+
+    def _schedule_summary(self, now: float) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._timer is not None:
+            if self._timer_loop is loop:
+                return
+            # The timer belongs to another loop, which may be closed and
+            # never run it.
+            self._cancel_summary()
+        delay = self._interval_start + self.summary_interval - now
+        self._timer = loop.call_later(max(delay, 0.0), self.flush)
+        self._timer_loop = loop
+
+    def _cancel_summary(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_loop = None
+
+    def _take_token(self, now: float) -> bool:
+        self._tokens = min(float(self.burst),
+                           self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _summarize(self, now: float) -> None:
+        elapsed = now - self._interval_start
+        for (hub, endpoint), count in self._suppressed.items():
+            self._logger.error(
+                "%s more failures from %s %s in the last %.0f seconds (%s total)",
+                count, hub, endpoint, elapsed, self.counts[(hub, endpoint)])
+        self._suppressed.clear()
+        self._logged.clear()
+        self._interval_start = now
+        self._cancel_summary()
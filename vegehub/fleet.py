@@ -0,0 +1,216 @@
+"""Management of many VegeHubs at once."""
+import asyncio
+from collections import deque
+from collections.abc import Callable, Coroutine, Iterable
+import contextlib
+import logging
+import time
+from typing import Any
+
+from vegehub.request_queue import (LATENCY_HISTORY, hedged_context,
+                                   percentile_of)
+from vegehub.vegehub import VegeHub
+from vegehub.watch import (DEFAULT_BUFFER_SIZE, OVERFLOW_DROP_OLDEST,
+                           HubWatcher, watch_hubs)
+
+_LOGGER = logging.getLogger(__name__)
+
+HEDGE_PERCENTILE = 95
+# Hubs need this many timed operations before their latency is trusted.
+HEDGE_MIN_SAMPLES = 5
+
+Operation = Callable[[VegeHub], Coroutine[Any, Any, Any]]
+
+
+class FleetResult():
+    """The outcome of one hub's part in a fleet operation."""
+
+    __slots__ = ("hub", "value", "error", "timed_out")
+
+    def __init__(self,
+                 hub: VegeHub,
+                 value: Any = None,
+                 error: BaseException | None = None,
+                 timed_out: bool = False) -> None:
+        self.hub = hub
+        self.value = value
+        self.error = error
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        """Whether the hub answered in time without an error."""
+        return self.error is None and not self.timed_out
+
+    def __repr__(self) -> str:
+        return (f"FleetResult(hub={self.hub.ip_address!r}, ok={self.ok}, "
+                f"timed_out={self.timed_out})")
+
+
+class VegeHubFleet():
+    """A collection of hubs, keyed by MAC address."""
+
+    def __init__(self, hubs: Iterable[VegeHub] = ()) -> None:
+        self._hubs: dict[str, VegeHub] = {}
+        self._hedging: set[str] = set()
+        self._latencies: dict[str, deque[float]] = {}
+        self.hedges_sent = 0
+        for hub in hubs:
+            self.add(hub)
+
+    def add(self, hub: VegeHub) -> None:
+        """Add a hub, keyed by its MAC address (or IP if the MAC is unknown)."""
+        self._hubs[self._key(hub)] = hub
+
+    def remove(self, hub: VegeHub) -> None:
+        """Remove a hub from the fleet."""
+        self._hubs.pop(self._key(hub), None)
+
+    def get(self, mac_address: str) -> VegeHub | None:
+        """Look up a hub by MAC address."""
+        return self._hubs.get(mac_address.replace(":", "").upper())
+
+    @property
+    def hubs(self) -> list[VegeHub]:
+        """All hubs in the fleet."""
+        return list(self._hubs.values())
+
+    def __len__(self) -> int:
+        return len(self._hubs)
+
+    @staticmethod
+    def _key(hub: VegeHub) -> str:
+        return (hub.mac_address or hub.ip_address).replace(":", "").upper()
+
+    async def run(self,
+                  operation: Operation,
+                  timeout: float | None = None,
+                  hedge: bool = False,
+                  limit: int | None = None) -> dict[str, FleetResult]:
+        """Run `operation` on every hub concurrently, keyed by hub.
+
+        With a timeout, every hub call shares one deadline; calls still
+        running when it passes are cancelled and reported as timed out.
+        With hedge, a hub that has not answered within its usual p95
+        latency gets one duplicate request, and the first answer wins. The
+        duplicate still waits its turn in the hub's request queue, but may
+        use its hedge slot. Only use hedging for idempotent reads. With a
+        limit, at most that many hubs are worked on at once, a hub's hedge
+        sharing its turn.
+        """
+        semaphore = asyncio.Semaphore(limit) if limit is not None else None
+        deadline = None
+        if timeout is not None:
+            deadline = asyncio.get_running_loop().time() + timeout
+        keys = list(self._hubs)
+        results = await asyncio.gather(*[
+            self._run_one(self._hubs[key], operation, deadline, hedge,
+                          semaphore) for key in keys
+        ])
+        return dict(zip(keys, results))
+
+    async def actuator_states(self,
+                              timeout: float | None = None,
+                              hedge: bool = False,
+                              retries: int = 0) -> dict[str, FleetResult]:
+        """Fetch actuator states from every hub."""
+        return await self.run(lambda hub: hub.actuator_states(retries),
+                              timeout, hedge)
+
+    async def info(self,
+                   timeout: float | None = None,
+                   hedge: bool = False) -> dict[str, FleetResult]:
+        """Fetch the hub info of every hub."""
+        return await self.run(VegeHub.get_info, timeout, hedge)
+
+    def operation_latency(self, hub: VegeHub,
+                          percentile: float = HEDGE_PERCENTILE) -> float | None:
+        """Recent successful operation time on a hub at the given percentile.
+
+        This is the time from a hub's turn starting under run()'s limit to
+        its answer, including the hub's request queue and retries, which is
+        what hedging compares against.
+        """
+        return percentile_of(self._latencies.get(self._key(hub), ()),
+                             percentile)
+
+    async def _run_one(self, hub: VegeHub, operation: Operation,
+                       deadline: float | None, hedge: bool,
+                       semaphore: asyncio.Semaphore | None) -> FleetResult:
+        scope = asyncio.timeout_at(deadline)
+        try:
+            async with scope, semaphore or contextlib.nullcontext():
+                # Start timing once the hub's turn comes, so waiting on the
+                # limit is neither recorded nor counted against the hedge.
+                start = time.monotonic()
+                if hedge:
+                    value = await self._hedged(hub, operation)
+                else:
+                    value = await operation(hub)
+        except TimeoutError as err:
+            if scope.expired():
+                return FleetResult(hub, timed_out=True)
+            return FleetResult(hub, error=err)
+        except Exception as err:  # pylint: disable=broad-except
+            return FleetResult(hub, error=err)
+        latencies = self._latencies.setdefault(self._key(hub),
+                                               deque(maxlen=LATENCY_HISTORY))
+        latencies.append(time.monotonic() - start)
+        return FleetResult(hub, value)
+
+    async def _hedged(self, hub: VegeHub, operation: Operation) -> Any:
+        """Run operation, duplicating it once if it is slower than usual."""
+        key = self._key(hub)
+        delay = None
+        if (key not in self._hedging and
+                len(self._latencies.get(key, ())) >= HEDGE_MIN_SAMPLES):
+            delay = self.operation_latency(hub)
+        primary = asyncio.ensure_future(operation(hub))
+        if delay is None:
+            return await primary
+
+        tasks = {primary}
+        hedging = False
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or key in self._hedging:
+                return await primary
+
+            # Hedge at most once per hub at a time, so a struggling hub
+            # never sees more than one extra request.
+            hedging = True
+            self._hedging.add(key)
+            self.hedges_sent += 1
+            tasks.add(asyncio.get_running_loop().create_task(
+                operation(hub), context=hedged_context()))
+            errors: list[BaseException] = []
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    errors.append(error)
+            raise errors[0]
+        finally:
+            if hedging:
+                self._hedging.discard(key)
+            for task in tasks:
+                task.cancel()
+
+    async def handle_push(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Route an update pushed by any hub to the hub it came from."""
+        hub = self.get(data.get("mac", ""))
+        if hub is None:
+            _LOGGER.debug("Received update from unknown hub %s",
+                          data.get("mac"))
+            return {}
+        return await hub.handle_push(data)
+
+    def watch(self,
+              maxsize: int = DEFAULT_BUFFER_SIZE,
+              overflow: str = OVERFLOW_DROP_OLDEST,
+              poll_interval: float | None = None) -> HubWatcher:
+        """Iterate over readings from every hub in the fleet as they arrive."""
+        return watch_hubs(self.hubs, maxsize, overflow, poll_interval)
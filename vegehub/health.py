@@ -0,0 +1,235 @@
+"""Per-hub health statistics from update payloads and request timings."""
+import time
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from vegehub.vegehub import VegeHub
+
+DEFAULT_ALPHA = 0.2
+# Battery readings closer together than this are too noisy for a trend.
+MIN_TREND_SECONDS = 600
+SECONDS_PER_DAY = 86400
+
+# Each of these adds one point to a hub's score: a round trip of RTT_SCALE,
+# a push lag of LAG_SCALE, WIFI_SCALE dB of signal below WIFI_GOOD, and a
+# battery falling by BATTERY_SCALE volts per day.
+RTT_SCALE = 1.0
+LAG_SCALE = 60.0
+WIFI_GOOD = -60.0
+WIFI_SCALE = 10.0
+BATTERY_SCALE = 0.1
+
+METRICS = ("score", "rtt", "push_lag", "wifi", "battery_trend")
+
+
+class Ewma():
+    """Exponentially weighted mean and variance of a stream of values."""
+
+    __slots__ = ("alpha", "mean", "variance", "count")
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA) -> None:
+        self.alpha = alpha
+        self.mean: float | None = None
+        self.variance = 0.0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Fold a value into the statistics."""
+        self.count += 1
+        if self.mean is None:
+            self.mean = value
+            return
+        diff = value - self.mean
+        increment = self.alpha * diff
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + diff * increment)
+
+    @property
+    def stddev(self) -> float:
+        """Exponentially weighted standard deviation."""
+        return self.variance**0.5
+
+
+class HubHealth():
+    """Health statistics of one hub."""
+
+    __slots__ = ("mac", "wifi", "battery", "battery_trend", "push_lag", "rtt",
+                 "payloads", "last_update", "requests_seen", "_trend_point")
+
+    def __init__(self, mac: str, alpha: float = DEFAULT_ALPHA) -> None:
+        self.mac = mac
+        self.wifi = Ewma(alpha)
+        self.battery = Ewma(alpha)
+        self.battery_trend = Ewma(alpha)
+        self.push_lag = Ewma(alpha)
+        self.rtt = Ewma(alpha)
+        self.payloads = 0
+        self.last_update: float | None = None
+        self.requests_seen = 0
+        self._trend_point: tuple[float, float] | None = None
+
+    def add_battery(self, volts: float, timestamp: float) -> None:
+        """Record a battery voltage, updating the trend in volts per day."""
+        self.battery.add(volts)
+        if self._trend_point is None:
+            self._trend_point = (timestamp, volts)
+            return
+        last_time, last_volts = self._trend_point
+        elapsed = timestamp - last_time
+        if elapsed >= MIN_TREND_SECONDS:
+            self.battery_trend.add(
+                (volts - last_volts) * SECONDS_PER_DAY / elapsed)
+            self._trend_point = (timestamp, volts)
+
+    def badness(self, metric: str = "score") -> float | None:
+        """How unhealthy the hub is by one metric, higher being worse.
+
+        The "score" metric adds up every metric that has data, each scaled
+        so that one point is noticeably unhealthy.
+        """
+        if metric == "score":
+            parts = [
+                self.badness(name) for name in METRICS if name != "score"
+            ]
+            known = [part for part in parts if part is not None]
+            return sum(known) if known else None
+        if metric == "rtt":
+            return _scaled(self.rtt.mean, RTT_SCALE)
+        if metric == "push_lag":
+            return _scaled(self.push_lag.mean, LAG_SCALE)
+        if metric == "wifi":
+            if self.wifi.mean is None:
+                return None
+            return max(0.0, WIFI_GOOD - self.wifi.mean) / WIFI_SCALE
+        if metric == "battery_trend":
+            if self.battery_trend.mean is None:
+                return None
+            return max(0.0, -self.battery_trend.mean) / BATTERY_SCALE
+        raise KeyError(f"Unknown health metric: {metric}")
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the current statistics as a dict."""
+        return {
+            "mac": self.mac,
+            "score": self.badness(),
+            "wifi": self.wifi.mean,
+            "battery": self.battery.mean,
+            "battery_trend": self.battery_trend.mean,
+            "push_lag": self.push_lag.mean,
+            "push_lag_stddev": self.push_lag.stddev,
+            "rtt": self.rtt.mean,
+            "rtt_stddev": self.rtt.stddev,
+            "payloads": self.payloads,
+            "last_update": self.last_update,
+        }
+
+
+def _scaled(value: float | None, scale: float) -> float | None:
+    return None if value is None else max(0.0, value) / scale
+
+
+class HealthTracker():
+    """Keep HubHealth for every hub and rank the least healthy ones.
+
+    Each observation is a handful of arithmetic updates, so observe_update
+    can be called on every payload.
+    """
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA) -> None:
+        self._alpha = alpha
+        self._hubs: dict[str, HubHealth] = {}
+
+    def get(self, mac: str) -> HubHealth:
+        """Health of a hub, created empty if it has not been seen."""
+        mac = mac.replace(":", "").upper()
+        health = self._hubs.get(mac)
+        if health is None:
+            health = self._hubs[mac] = HubHealth(mac, self._alpha)
+        return health
+
+    def __len__(self) -> int:
+        return len(self._hubs)
+
+    def observe_update(self,
+                       data: dict[str, Any],
+                       num_sensors: int | None = None,
+                       is_ac: bool = False,
+                       received: float | None = None) -> None:
+        """Record the signal, push lag and battery of a raw update.
+
+        The battery is read from the slot update_data_to_ha_dict maps to
+        "battery", so it is only recorded if num_sensors is given.
+        """
+        if "mac" not in data:
+            return
+        if received is None:
+            received = time.time()
+        health = self.get(data["mac"])
+        health.payloads += 1
+        health.last_update = received
+
+        wifi = data.get("wifi_str")
+        if isinstance(wifi, (int, float)):
+            health.wifi.add(wifi)
+        send_time = data.get("send_time")
+        if isinstance(send_time, (int, float)):
+            health.push_lag.add(received - send_time)
+            timestamp = send_time
+        else:
+            timestamp = received
+
+        if num_sensors is None or is_ac:
+            return
+        for sensor in data.get("sensors", []):
+            if sensor.get("slot") == num_sensors + 1:
+                samples = sensor.get("samples")
+                if samples and isinstance(samples[-1].get("v"), (int, float)):
+                    health.add_battery(samples[-1]["v"], timestamp)
+                break
+
+    def observe_info(self,
+                     mac: str,
+                     info: dict[str, Any],
+                     received: float | None = None) -> None:
+        """Record the batt_v of an info response."""
+        volts = info.get("batt_v")
+        if isinstance(volts, (int, float)):
+            self.get(mac).add_battery(
+                volts, time.time() if received is None else received)
+
+    def observe_rtt(self, mac: str, seconds: float) -> None:
+        """Record the round trip time of one request."""
+        self.get(mac).rtt.add(seconds)
+
+    def observe_hub(self, hub: "VegeHub") -> None:
+        """Record a hub's recent median request latency as its RTT.
+
+        Nothing is recorded unless the hub has completed requests since it
+        was last observed.
+        """
+        if not hub.mac_address:
+            return
+        health = self.get(hub.mac_address)
+        requests = hub.queue_metrics["total_requests"]
+        if requests > health.requests_seen:
+            health.requests_seen = requests
+            latency = hub.request_latency(50)
+            if latency is not None:
+                health.rtt.add(latency)
+
+    def worst(self, count: int = 10, metric: str = "score") -> list[HubHealth]:
+        """The `count` least healthy hubs by a metric, worst first.
+
+        Hubs without data for the metric are left out.
+        """
+        ranked = []
+        for health in self._hubs.values():
+            badness = health.badness(metric)
+            if badness is not None:
+                ranked.append((badness, health.mac, health))
+        ranked.sort(key=lambda entry: (-entry[0], entry[1]))
+        return [health for _, _, health in ranked[:count]]
+
+    def forget(self, mac: str) -> None:
+        """Drop the statistics of a hub."""
+        self._hubs.pop(mac.replace(":", "").upper(), None)
@@ -1,6 +1,13 @@
 """Helper file containing data transformations."""
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+import math
 from typing import Any
 
+from vegehub import profiling
+
 def vh400_transform(value: int | str | float) -> float | None:
     """Perform a piecewise linear transformation on the input value.
 
@@ -71,6 +78,98 @@ def update_data_to_latest_dict(data: dict[str,Any]) -> dict[str,Any]:
             sensor_data[entity_id] = value
     return sensor_data
 
+def _sample_timestamp(sample_time: str | None, fallback: int) -> int:
+    """Convert a sample's ISO 8601 "t" into seconds since the epoch."""
+    if not sample_time:
+        return fallback
+    try:
+        return int(datetime.fromisoformat(sample_time).timestamp())
+    except ValueError:
+        return fallback
+
+
+def _sample_value(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def update_data_to_latest_columns(payloads: Iterable[dict[str, Any]],
+                                  as_numpy: bool | None = None) -> dict[str, Any]:
+    """Accepts many raw updates and returns the latest value of each sensor as columns.
+
+    The result holds parallel "mac", "slot", "timestamp" and "value" columns,
+    one row per sensor per update, as arrays (mac is a list). A value that
+    is not a number is stored as NaN, so one bad sample does not stop the
+    rest from being decoded. With as_numpy the columns are NumPy arrays
+    instead; by default NumPy is used if installed.
+    """
+    macs: list[str] = []
+    slots = array("q")
+    timestamps = array("q")
+    values = array("d")
+
+    for data in payloads:
+        if "sensors" not in data or "mac" not in data:
+            continue
+        mac = data["mac"].lower()
+        send_time = int(data.get("send_time") or 0)
+        # Unparseable times fall back to this payload's send_time, so the
+        # cache must not outlive the payload.
+        last_time: str | None = None
+        last_timestamp = send_time
+        for sensor in data["sensors"]:
+            samples = sensor.get("samples")
+            if not samples:
+                continue
+            latest_sample = samples[-1]
+            sample_time = latest_sample.get("t")
+            # Samples in an update almost always share one time, so only
+            # parse it when it changes.
+            if sample_time != last_time or not sample_time:
+                last_time = sample_time
+                last_timestamp = _sample_timestamp(sample_time, send_time)
+            macs.append(mac)
+            slots.append(int(sensor.get("slot", 0)))
+            timestamps.append(last_timestamp)
+            values.append(_sample_value(latest_sample.get("v", 0)))
+
+    columns: dict[str, Any] = {
+        "mac": macs,
+        "slot": slots,
+        "timestamp": timestamps,
+        "value": values,
+    }
+    if as_numpy is False:
+        return columns
+    try:
+        import numpy  # type: ignore[import-not-found]  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        if as_numpy:
+            raise
+        return columns
+    return {
+        "mac": numpy.array(macs, dtype=str),
+        "slot": numpy.frombuffer(slots, dtype=numpy.int64),
+        "timestamp": numpy.frombuffer(timestamps, dtype=numpy.int64),
+        "value": numpy.frombuffer(values, dtype=numpy.float64),
+    }
+
+
+def iter_update_columns(payloads: Iterable[dict[str, Any]],
+                        chunk_size: int = 10000,
+                        as_numpy: bool | None = None) -> Iterator[dict[str, Any]]:
+    """Decode a stream of raw updates into columns, chunk_size updates at a time."""
+    iterator = iter(payloads)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield update_data_to_latest_columns(chunk, as_numpy)
+
+
+@profiling.timed("decode.ha_dict")
 def update_data_to_ha_dict(
     data: dict[str, Any],
     num_sensors: int,
@@ -0,0 +1,210 @@
+"""Lightweight typed models for data exchanged with a VegeHub.
+
+Each model is parsed and validated once from the raw JSON dict, then gives
+plain attribute access. They use __slots__ so large numbers of them can be
+kept around cheaply.
+"""
+from typing import Any
+
+
+def _int(data: dict[str, Any], key: str, default: int = 0) -> int:
+    try:
+        return int(data.get(key) or default)
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"Invalid {key}: {data.get(key)!r}") from err
+
+
+def _float(data: dict[str, Any], key: str) -> float | None:
+    value = data.get(key)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"Invalid {key}: {value!r}") from err
+
+
+def _optional_int(data: dict[str, Any], key: str) -> int | None:
+    value = data.get(key)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"Invalid {key}: {value!r}") from err
+
+
+class HubInfo():
+    """The "hub" section of an /api/info/get response."""
+
+    __slots__ = ("num_sensors", "num_actuators", "sw_version", "is_ac",
+                 "batt_v", "num_vsens", "has_sd", "agenda")
+
+    def __init__(self,
+                 num_sensors: int,
+                 num_actuators: int,
+                 sw_version: str | None,
+                 is_ac: bool,
+                 batt_v: float | None = None,
+                 num_vsens: int = 0,
+                 has_sd: bool = False,
+                 agenda: int = 0) -> None:
+        self.num_sensors = num_sensors
+        self.num_actuators = num_actuators
+        self.sw_version = sw_version
+        self.is_ac = is_ac
+        self.batt_v = batt_v
+        self.num_vsens = num_vsens
+        self.has_sd = has_sd
+        self.agenda = agenda
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "HubInfo":
+        """Parse the hub info dict, raising ValueError on bad values."""
+        return cls(num_sensors=_int(data, "num_channels"),
+                   num_actuators=_int(data, "num_actuators"),
+                   sw_version=data.get("version"),
+                   is_ac=bool(data.get("is_ac")),
+                   batt_v=_float(data, "batt_v"),
+                   num_vsens=_int(data, "num_vsens"),
+                   has_sd=bool(data.get("has_sd")),
+                   agenda=_int(data, "agenda"))
+
+    def __repr__(self) -> str:
+        return (f"HubInfo(num_sensors={self.num_sensors}, "
+                f"num_actuators={self.num_actuators}, "
+                f"sw_version={self.sw_version!r}, is_ac={self.is_ac})")
+
+
+class HubConfig():
+    """An /api/config/get response: API key, push target and other settings."""
+
+    __slots__ = ("api_key", "server_url", "server_type", "hub")
+
+    def __init__(self, api_key: str | None, server_url: str | None,
+                 server_type: int | None, hub: dict[str, Any]) -> None:
+        self.api_key = api_key
+        self.server_url = server_url
+        self.server_type = server_type
+        self.hub = hub
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "HubConfig":
+        """Parse a config dict, raising ValueError if it has no hub section."""
+        hub = data.get("hub")
+        if not isinstance(hub, dict):
+            raise ValueError("Config has no hub section")
+        return cls(api_key=data.get("api_key"),
+                   server_url=hub.get("server_url"),
+                   server_type=_optional_int(hub, "server_type"),
+                   hub=hub)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Build the dict to send back to /api/config/set."""
+        hub = dict(self.hub)
+        if self.server_url is not None:
+            hub["server_url"] = self.server_url
+        if self.server_type is not None:
+            hub["server_type"] = self.server_type
+        return {"api_key": self.api_key, "hub": hub}
+
+
+class ActuatorStatus():
+    """One entry of an /api/actuators/status response."""
+
+    __slots__ = ("slot", "state", "last_run", "next_window_start",
+                 "next_window_end", "cur_ma", "typ_ma", "error")
+
+    def __init__(self,
+                 slot: int,
+                 state: int,
+                 last_run: int = 0,
+                 next_window_start: int = 0,
+                 next_window_end: int = 0,
+                 cur_ma: int = 0,
+                 typ_ma: int = 0,
+                 error: int = 0) -> None:
+        self.slot = slot
+        self.state = state
+        self.last_run = last_run
+        self.next_window_start = next_window_start
+        self.next_window_end = next_window_end
+        self.cur_ma = cur_ma
+        self.typ_ma = typ_ma
+        self.error = error
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ActuatorStatus":
+        """Parse an actuator status dict, raising ValueError on bad values."""
+        if "slot" not in data:
+            raise ValueError("Actuator status has no slot")
+        return cls(slot=_int(data, "slot"),
+                   state=_int(data, "state"),
+                   last_run=_int(data, "last_run"),
+                   next_window_start=_int(data, "next_window_start"),
+                   next_window_end=_int(data, "next_window_end"),
+                   cur_ma=_int(data, "cur_ma"),
+                   typ_ma=_int(data, "typ_ma"),
+                   error=_int(data, "error"))
+
+    def __repr__(self) -> str:
+        return f"ActuatorStatus(slot={self.slot}, state={self.state})"
+
+
+class SlotSamples():
+    """The samples reported for one slot of an update."""
+
+    __slots__ = ("slot", "times", "values")
+
+    def __init__(self, slot: int, times: tuple[str, ...],
+                 values: tuple[Any, ...]) -> None:
+        self.slot = slot
+        self.times = times
+        self.values = values
+
+    @property
+    def latest(self) -> Any:
+        """The most recent value, or None if there are no samples."""
+        return self.values[-1] if self.values else None
+
+
+class UpdatePayload():
+    """A data update pushed by a hub."""
+
+    __slots__ = ("mac", "send_time", "wifi_str", "error_code", "sensors")
+
+    def __init__(self, mac: str, send_time: int | None, wifi_str: int | None,
+                 error_code: int, sensors: tuple[SlotSamples, ...]) -> None:
+        self.mac = mac
+        self.send_time = send_time
+        self.wifi_str = wifi_str
+        self.error_code = error_code
+        self.sensors = sensors
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "UpdatePayload":
+        """Parse a raw update, raising ValueError if it is malformed."""
+        if "mac" not in data or "sensors" not in data:
+            raise ValueError("Update has no mac or sensors")
+        sensors = []
+        for item in sorted(data["sensors"], key=lambda x: x.get("slot", 0)):
+            samples = item.get("samples", [])
+            sensors.append(
+                SlotSamples(_int(item, "slot"),
+                            tuple(sample.get("t") for sample in samples),
+                            tuple(sample.get("v", 0) for sample in samples)))
+        return cls(mac=data["mac"],
+                   send_time=_optional_int(data, "send_time"),
+                   wifi_str=_optional_int(data, "wifi_str"),
+                   error_code=_int(data, "error_code"),
+                   sensors=tuple(sensors))
+
+    def latest_values(self) -> dict[int, Any]:
+        """Map each slot with samples to its most recent value."""
+        return {
+            sensor.slot: sensor.values[-1]
+            for sensor in self.sensors if sensor.values
+        }
+
+    def __repr__(self) -> str:
+        return f"UpdatePayload(mac={self.mac!r}, send_time={self.send_time})"
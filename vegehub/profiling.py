@@ -0,0 +1,189 @@
+"""Opt-in profiling of client requests and decoding.
+
+Stage timers are switched on and off at runtime with enable() and
+disable(). While disabled, a timed function costs one flag check per call
+and stage() hands back a shared no-op context manager. The library times
+these stages:
+
+    http.session     opening and closing a per-request aiohttp session
+    http.request     sending a request and reading its response
+    json             decoding a response body
+    decode.ha_dict   update_data_to_ha_dict
+    decode.pipeline  SensorPipeline.decode, including probe transforms
+
+profile_window() and trace_memory() capture a cProfile or tracemalloc
+view of a block of code, and can dump it to a file:
+
+    profiling.enable()
+    with profiling.profile_window("ingest.prof"):
+        await asyncio.sleep(60)
+    profiling.dump_stats("stages.json")
+"""
+import contextlib
+import functools
+import time
+from collections.abc import Callable, Iterator
+from typing import Any, TypeVar, TYPE_CHECKING
+
+# cProfile, tracemalloc and json are only imported when used, so that timed
+# modules such as the helpers stay cheap to import.
+if TYPE_CHECKING:
+    import cProfile
+    import tracemalloc
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+# The code.co_flags bit set on "async def" functions, inspect.CO_COROUTINE.
+# Its value is fixed and documented, so it is copied here rather than
+# importing inspect (or asyncio) into every module that uses timed(), which
+# is only applied to plain "async def" functions.
+_CO_COROUTINE = 0x80
+
+_enabled = False  # pylint: disable=invalid-name
+# Stage name -> [count, total seconds, max seconds]
+_stages: dict[str, list[float]] = {}
+_NULL = contextlib.nullcontext()
+
+
+def enable() -> None:
+    """Start recording stage timings."""
+    global _enabled  # pylint: disable=global-statement
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop recording stage timings, keeping those recorded so far."""
+    global _enabled  # pylint: disable=global-statement
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """Whether stage timings are being recorded."""
+    return _enabled
+
+
+def _record(name: str, elapsed: float) -> None:
+    entry = _stages.get(name)
+    if entry is None:
+        _stages[name] = [1, elapsed, elapsed]
+        return
+    entry[0] += 1
+    entry[1] += elapsed
+    if elapsed > entry[2]:
+        entry[2] = elapsed
+
+
+class _Stage():
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc: object) -> None:
+        _record(self.name, time.perf_counter() - self.start)
+
+
+def stage(name: str) -> contextlib.AbstractContextManager:
+    """Time a block of code as `name`, if profiling is enabled."""
+    return _Stage(name) if _enabled else _NULL
+
+
+def timed(name: str) -> Callable[[_F], _F]:
+    """Decorate a function or coroutine function to be timed as `name`."""
+
+    def decorator(func: _F) -> _F:
+        code = getattr(func, "__code__", None)
+        if code is not None and code.co_flags & _CO_COROUTINE:
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not _enabled:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _record(name, time.perf_counter() - start)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def stage_stats() -> dict[str, dict[str, float]]:
+    """Call count, total, mean and max seconds of every recorded stage."""
+    return {
+        name: {
+            "count": count,
+            "total": total,
+            "mean": total / count,
+            "max": longest,
+        } for name, (count, total, longest) in sorted(_stages.items())
+    }
+
+
+def reset() -> None:
+    """Forget all recorded stage timings."""
+    _stages.clear()
+
+
+def dump_stats(path: str) -> None:
+    """Write the stage timings to a JSON file."""
+    import json  # pylint: disable=import-outside-toplevel
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(stage_stats(), output, indent=2)
+
+
+@contextlib.contextmanager
+def profile_window(path: str | None = None) -> Iterator["cProfile.Profile"]:
+    """Run cProfile over a block, dumping pstats data to `path` if given."""
+    import cProfile  # pylint: disable=import-outside-toplevel,redefined-outer-name
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path is not None:
+            profiler.dump_stats(path)
+
+
+@contextlib.contextmanager
+def trace_memory(path: str | None = None,
+                 frames: int = 1) -> Iterator[list["tracemalloc.Snapshot"]]:
+    """Trace allocations over a block and snapshot them at its end.
+
+    The snapshot is appended to the yielded list and, if `path` is given,
+    dumped there for tracemalloc.Snapshot.load. Tracing is left running if
+    it was already on.
+    """
+    import tracemalloc  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    snapshots: list["tracemalloc.Snapshot"] = []
+    try:
+        yield snapshots
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        if started:
+            tracemalloc.stop()
+        snapshots.append(snapshot)
+        if path is not None:
+            snapshot.dump(path)
@@ -0,0 +1,280 @@
+"""Record raw update payloads and replay them to measure decode throughput.
+
+Captures are gzip compressed JSON lines, one {"offset": seconds, "payload":
+update} object per line, where offset is the time since the first record.
+Replays read the capture in order and feed each payload to a handler, either
+paced like the original traffic (scaled by a speed factor) or as fast as
+possible, and report throughput and per-payload latency percentiles. Memory
+use can be traced too, though tracing slows the handler, so its timings are
+then not comparable with an untraced replay.
+
+    python -m vegehub.replay record payloads.jsonl capture.jsonl.gz
+    python -m vegehub.replay replay capture.jsonl.gz --speed 0
+"""
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+import gzip
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, TYPE_CHECKING
+
+from vegehub.batch import Transforms, decode_payload
+from vegehub.request_queue import percentile_of
+
+if TYPE_CHECKING:
+    import aiohttp
+
+Handler = Callable[[dict[str, Any]], Any]
+AsyncHandler = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+class CaptureWriter():
+    """Append payloads to a compressed capture file."""
+
+    def __init__(self, path: str) -> None:
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._start: float | None = None
+        self.count = 0
+
+    def write(self, payload: dict[str, Any],
+              received: float | None = None) -> None:
+        """Record a payload received at `received` (default: now)."""
+        if received is None:
+            received = time.monotonic()
+        if self._start is None:
+            self._start = received
+        record = {"offset": round(received - self._start, 6), "payload": payload}
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        """Finish writing the capture."""
+        self._file.close()
+
+    def __enter__(self) -> "CaptureWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def record_capture(path: str, payloads: Iterable[dict[str, Any]],
+                   interval: float = 0.0) -> int:
+    """Write payloads to a capture, spaced `interval` seconds apart."""
+    with CaptureWriter(path) as writer:
+        for number, payload in enumerate(payloads):
+            writer.write(payload, number * interval)
+        return writer.count
+
+
+def read_capture(path: str) -> Iterator[tuple[float, dict[str, Any]]]:
+    """Yield (offset, payload) pairs from a capture, in recorded order."""
+    with gzip.open(path, "rt", encoding="utf-8") as capture:
+        for line in capture:
+            if line.strip():
+                record = json.loads(line)
+                yield float(record["offset"]), record["payload"]
+
+
+class ReplayReport():
+    """Results of replaying a capture."""
+
+    def __init__(self, latencies: list[float], elapsed: float,
+                 retained: int, peak: int) -> None:
+        self.count = len(latencies)
+        self.elapsed = elapsed
+        # Traced memory still held after the replay, less what was held
+        # before it, and the peak above that starting point.
+        self.retained = retained
+        self.peak = peak
+        self._latencies = sorted(latencies)
+
+    @property
+    def throughput(self) -> float:
+        """Payloads handled per second."""
+        return self.count / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """Handler latency in seconds at the given percentile."""
+        return percentile_of(self._latencies, percentile) or 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the report as a dict."""
+        return {
+            "count": self.count,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "retained_bytes": self.retained,
+            "peak_bytes": self.peak,
+        }
+
+
+def decode_handler(num_sensors: int,
+                   num_actuators: int,
+                   is_ac: bool,
+                   transforms: Transforms | None = None) -> Handler:
+    """Build a handler that decodes payloads like a live integration would."""
+
+    def handler(data: dict[str, Any]) -> dict[str, Any]:
+        return decode_payload(data, num_sensors, num_actuators, is_ac,
+                              transforms)
+
+    return handler
+
+
+def http_push_handler(session: "aiohttp.ClientSession",
+                      url: str) -> AsyncHandler:
+    """Build a handler that POSTs payloads to a push endpoint, like a hub."""
+
+    async def handler(data: dict[str, Any]) -> int:
+        async with session.post(url, json=data) as response:
+            return response.status
+
+    return handler
+
+
+class _MemoryMeter():
+    """Trace memory over a replay, leaving tracing as it was found."""
+
+    def __init__(self, enabled: bool) -> None:
+        self._enabled = enabled
+        self._started = False
+        self._baseline = 0
+
+    def start(self) -> None:
+        """Start tracing, or restart the peak if it is already running."""
+        if not self._enabled:
+            return
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+
+    def stop(self) -> tuple[int, int]:
+        """Return (retained, peak) bytes since start()."""
+        if not self._enabled:
+            return 0, 0
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started:
+            tracemalloc.stop()
+        return current - self._baseline, peak - self._baseline
+
+
+def replay(path: str,
+           handler: Handler,
+           speed: float = 0.0,
+           trace_memory: bool = False) -> ReplayReport:
+    """Feed a capture to `handler`, paced at `speed` times real time.
+
+    A speed of 0 replays as fast as possible. The capture is loaded before
+    timing starts, so only handling and pacing are timed.
+    """
+    records = list(read_capture(path))
+    latencies = []
+    meter = _MemoryMeter(trace_memory)
+    meter.start()
+    start = time.perf_counter()
+    for offset, payload in records:
+        if speed > 0:
+            delay = start + offset / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        before = time.perf_counter()
+        handler(payload)
+        latencies.append(time.perf_counter() - before)
+    elapsed = time.perf_counter() - start
+    retained, peak = meter.stop()
+    return ReplayReport(latencies, elapsed, retained, peak)
+
+
+async def async_replay(path: str,
+                       handler: AsyncHandler,
+                       speed: float = 0.0,
+                       trace_memory: bool = False) -> ReplayReport:
+    """Feed a capture to an async `handler`, paced at `speed` times real time."""
+    records = list(read_capture(path))
+    latencies = []
+    meter = _MemoryMeter(trace_memory)
+    meter.start()
+    start = time.perf_counter()
+    for offset, payload in records:
+        if speed > 0:
+            delay = start + offset / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        before = time.perf_counter()
+        await handler(payload)
+        latencies.append(time.perf_counter() - before)
+    elapsed = time.perf_counter() - start
+    retained, peak = meter.stop()
+    return ReplayReport(latencies, elapsed, retained, peak)
+
+
+def _load_payloads(path: str) -> Iterator[dict[str, Any]]:
+    with open(path, encoding="utf-8") as source:
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+
+
+async def _replay_http(path: str, url: str, speed: float,
+                       trace_memory: bool) -> ReplayReport:
+    import aiohttp  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    async with aiohttp.ClientSession() as session:
+        return await async_replay(path, http_push_handler(session, url), speed,
+                                  trace_memory)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(prog="python -m vegehub.replay")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser(
+        "record", help="capture payloads from a JSON lines file")
+    record_parser.add_argument("source")
+    record_parser.add_argument("capture")
+    record_parser.add_argument("--interval", type=float, default=0.0)
+
+    replay_parser = commands.add_parser("replay", help="replay a capture")
+    replay_parser.add_argument("capture")
+    replay_parser.add_argument("--speed", type=float, default=0.0,
+                               help="multiple of real time, 0 for maximum")
+    replay_parser.add_argument("--sensors", type=int, default=4)
+    replay_parser.add_argument("--actuators", type=int, default=2)
+    replay_parser.add_argument("--ac", action="store_true")
+    replay_parser.add_argument("--trace-memory", action="store_true",
+                               help="also trace memory, slowing the handler")
+    replay_parser.add_argument("--url",
+                               help="POST payloads to this push endpoint")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        count = record_capture(args.capture, _load_payloads(args.source),
+                               args.interval)
+        print(json.dumps({"recorded": count}))
+        return 0
+
+    if args.url:
+        report = asyncio.run(
+            _replay_http(args.capture, args.url, args.speed,
+                         args.trace_memory))
+    else:
+        report = replay(args.capture,
+                        decode_handler(args.sensors, args.actuators, args.ac),
+                        args.speed, args.trace_memory)
+    print(json.dumps(report.as_dict()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
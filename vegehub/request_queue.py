@@ -0,0 +1,158 @@
+"""Prioritized, concurrency limited queue for requests to one hub."""
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+import contextvars
+import heapq
+import time
+from typing import Any
+
+# Lower numbers are sent first.
+PRIORITY_COMMAND = 0
+PRIORITY_CONFIG = 1
+PRIORITY_POLL = 2
+
+LATENCY_HISTORY = 100
+
+# Set in the context of a hedged request, which may use a hedge slot when
+# every normal slot is taken, e.g. by the request it duplicates.
+_HEDGED: contextvars.ContextVar[bool] = contextvars.ContextVar("hedged",
+                                                               default=False)
+
+
+def percentile_of(values: Iterable[float],
+                  percentile: float) -> float | None:
+    """The value at the given percentile (nearest rank), or None if empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(int(len(ordered) * percentile / 100), len(ordered) - 1)]
+
+
+def hedged_context() -> contextvars.Context:
+    """Return a context for running a hedged duplicate of a request."""
+    context = contextvars.copy_context()
+    context.run(_HEDGED.set, True)
+    return context
+
+
+class RequestQueue():
+    """Admit at most `concurrency` requests at a time, highest priority first.
+
+    Requests of equal priority are admitted in arrival order. Hedged
+    requests (see hedged_context) wait their turn like any other, but when
+    every normal slot is taken they may use one of `max_hedges` extra
+    slots, so a stalled request can be duplicated without letting more
+    than that many extra requests reach the hub.
+    """
+
+    def __init__(self, concurrency: int = 1, max_hedges: int = 1) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.max_hedges = max_hedges
+        self._in_flight = 0
+        self._hedges_in_flight = 0
+        self._waiting: list[tuple[int, int, bool, asyncio.Future]] = []
+        self._sequence = 0
+        self.total_requests = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.hedged_requests = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_HISTORY)
+
+    @property
+    def depth(self) -> int:
+        """Number of requests waiting to be sent."""
+        return sum(1 for *_, future in self._waiting if not future.done())
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently being sent."""
+        return self._in_flight + self._hedges_in_flight
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Queue depth and wait time statistics."""
+        return {
+            "depth": self.depth,
+            "in_flight": self.in_flight,
+            "total_requests": self.total_requests,
+            "max_depth": self.max_depth,
+            "mean_wait": (self.total_wait / self.total_requests
+                          if self.total_requests else 0.0),
+            "max_wait": self.max_wait,
+            "hedged_requests": self.hedged_requests,
+        }
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """Time spent on recent successful requests at the given percentile."""
+        return percentile_of(self._latencies, percentile)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_POLL) -> AsyncIterator[None]:
+        """Wait for a turn to send a request, holding it for the block."""
+        hedge_slot = await self._acquire(priority, _HEDGED.get())
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(hedge_slot)
+        self._latencies.append(time.monotonic() - start)
+
+    async def _acquire(self, priority: int, hedged: bool) -> bool:
+        """Wait for a slot, returning whether it is a hedge slot."""
+        start = time.monotonic()
+        hedge_slot = None if self._waiting else self._take(hedged)
+        if hedge_slot is None:
+            future = asyncio.get_running_loop().create_future()
+            self._sequence += 1
+            heapq.heappush(self._waiting,
+                           (priority, self._sequence, hedged, future))
+            self.max_depth = max(self.max_depth, len(self._waiting))
+            try:
+                hedge_slot = await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The turn was granted just as we were cancelled.
+                    self._release(future.result())
+                raise
+        wait = time.monotonic() - start
+        self.total_requests += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        if hedged:
+            self.hedged_requests += 1
+        return hedge_slot
+
+    def _take(self, hedged: bool) -> bool | None:
+        """Take a free slot, or return None if the request has to wait.
+
+        Returns True for a hedge slot and False for a normal one.
+        """
+        if self._in_flight < self.concurrency:
+            self._in_flight += 1
+            return False
+        if hedged and self._hedges_in_flight < self.max_hedges:
+            self._hedges_in_flight += 1
+            return True
+        return None
+
+    def _release(self, hedge_slot: bool) -> None:
+        if hedge_slot:
+            self._hedges_in_flight -= 1
+        else:
+            self._in_flight -= 1
+        # Admit strictly in order, so nothing overtakes a waiting request.
+        while self._waiting:
+            _, _, hedged, future = self._waiting[0]
+            if future.done():
+                heapq.heappop(self._waiting)
+                continue
+            slot = self._take(hedged)
+            if slot is None:
+                break
+            heapq.heappop(self._waiting)
+            future.set_result(slot)
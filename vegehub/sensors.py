@@ -0,0 +1,83 @@
+"""Sensor type registry and per-hub compiled decode pipelines."""
+from collections.abc import Callable
+from typing import Any
+
+from vegehub import profiling
+from vegehub.helpers import therm200_transform, vh400_transform
+
+Transform = Callable[[Any], Any]
+
+SENSOR_RAW = "raw"
+SENSOR_VH400 = "vh400"
+SENSOR_THERM200 = "therm200"
+
+_SENSOR_TYPES: dict[str, Transform | None] = {
+    SENSOR_RAW: None,
+    SENSOR_VH400: vh400_transform,
+    SENSOR_THERM200: therm200_transform,
+}
+
+
+def register_sensor_type(name: str, transform: Transform | None) -> None:
+    """Register a probe type and the transform from voltage to its units."""
+    _SENSOR_TYPES[name] = transform
+
+
+def sensor_types() -> list[str]:
+    """List the names of every registered probe type."""
+    return list(_SENSOR_TYPES)
+
+
+def get_sensor_transform(name: str) -> Transform | None:
+    """Look up the transform for a probe type, raising KeyError if unknown."""
+    return _SENSOR_TYPES[name]
+
+
+class SensorPipeline():
+    """Decoder for one hub layout with each slot's transform bound up front.
+
+    The hub layout and the sensor type of each analog channel are resolved
+    once into a table of slot -> (entity id, transform), so decoding an
+    update is a single pass over its sensors with no per-sample dispatch.
+    Output keys match update_data_to_ha_dict.
+    """
+
+    def __init__(self,
+                 num_sensors: int,
+                 num_actuators: int,
+                 is_ac: bool,
+                 slot_types: dict[int, str] | None = None) -> None:
+        self.num_sensors = num_sensors
+        self.num_actuators = num_actuators
+        self.is_ac = is_ac
+        self.slot_types = dict(slot_types or {})
+        self._table: dict[int, tuple[str, Transform | None]] = {}
+
+        for index in range(num_sensors):
+            transform = get_sensor_transform(
+                self.slot_types.get(index, SENSOR_RAW))
+            self._table[index + 1] = (f"analog_{index}", transform)
+        if not is_ac:
+            self._table[num_sensors + 1] = ("battery", None)
+        actuator_offset = num_sensors + (0 if is_ac else 1)
+        for index in range(num_actuators):
+            self._table[actuator_offset + index + 1] = (f"actuator_{index}",
+                                                        None)
+
+    @profiling.timed("decode.pipeline")
+    def decode(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Transform raw update data into final values per entity."""
+        if not ("sensors" in data and "mac" in data):
+            return {}
+
+        table = self._table
+        result = {}
+        for item in data["sensors"]:
+            entry = table.get(item.get("slot", 0))
+            samples = item.get("samples")
+            if entry is None or not samples:
+                continue
+            value = samples[-1].get("v", 0)
+            entity_id, transform = entry
+            result[entity_id] = value if transform is None else transform(value)
+        return result
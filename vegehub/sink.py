@@ -0,0 +1,157 @@
+"""Batched SQLite storage for decoded readings."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import sqlite3
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MAX_AGE = 1.0
+DEFAULT_QUEUE_SIZE = 10000
+
+Row = tuple[str, str, int, float]
+
+
+class SQLiteSink():
+    """Write readings to SQLite in batched transactions on one writer thread.
+
+    Readings are queued with put(), which waits when the queue is full so
+    producers slow down to what the disk can take. A batch is written once
+    it holds batch_size rows or its oldest row is max_age seconds old.
+    """
+
+    def __init__(self,
+                 path: str,
+                 table: str = "readings",
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_age: float = DEFAULT_MAX_AGE,
+                 queue_size: int = DEFAULT_QUEUE_SIZE) -> None:
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self._path = path
+        self._table = table
+        self._batch_size = batch_size
+        self._max_age = max_age
+        self._queue_size = queue_size
+        self._queue: asyncio.Queue[Row] | None = None
+        self._pump: asyncio.Task | None = None
+        self._writer: ThreadPoolExecutor | None = None
+        self._connection: sqlite3.Connection | None = None
+        self._pending: list[Row] = []
+        self.rows_written = 0
+        self.batches_written = 0
+        self.write_seconds = 0.0
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Queue depth and write throughput."""
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "rows_written": self.rows_written,
+            "batches_written": self.batches_written,
+            "write_seconds": self.write_seconds,
+            "rows_per_second": (self.rows_written / self.write_seconds
+                                if self.write_seconds else 0.0),
+        }
+
+    async def start(self) -> None:
+        """Open the database and start writing queued readings."""
+        loop = asyncio.get_running_loop()
+        self._writer = ThreadPoolExecutor(max_workers=1,
+                                          thread_name_prefix="vegehub-sink")
+        await loop.run_in_executor(self._writer, self._open)
+        self._queue = asyncio.Queue(self._queue_size)
+        self._pump = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Write everything still queued, then close the database."""
+        if self._pump is not None:
+            self._pump.cancel()
+            await asyncio.gather(self._pump, return_exceptions=True)
+            self._pump = None
+        if self._writer is not None:
+            rows, self._pending = self._pending, []
+            while self._queue is not None and not self._queue.empty():
+                rows.append(self._queue.get_nowait())
+            loop = asyncio.get_running_loop()
+            if rows:
+                await loop.run_in_executor(self._writer, self._write, rows)
+            await loop.run_in_executor(self._writer, self._close)
+            self._writer.shutdown()
+            self._writer = None
+
+    async def __aenter__(self) -> "SQLiteSink":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def put(self, mac: str, entity: str, timestamp: int,
+                  value: int | float) -> None:
+        """Queue one reading, waiting if the queue is full."""
+        if self._queue is None:
+            raise RuntimeError("SQLiteSink has not been started")
+        await self._queue.put((mac.lower(), entity, timestamp, float(value)))
+
+    async def put_ha_dict(self, mac: str, values: dict[str, Any],
+                          timestamp: int) -> None:
+        """Queue every numeric value of an update_data_to_ha_dict result."""
+        for entity, value in values.items():
+            if isinstance(value, (int, float)):
+                await self.put(mac, entity, timestamp, value)
+
+    async def _run(self) -> None:
+        assert self._queue is not None and self._writer is not None
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            rows = self._pending
+            rows.append(await queue.get())
+            flush_at = loop.time() + self._max_age
+            while len(rows) < self._batch_size:
+                if queue.empty():
+                    remaining = flush_at - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        async with asyncio.timeout(remaining):
+                            rows.append(await queue.get())
+                    except TimeoutError:
+                        break
+                else:
+                    rows.append(queue.get_nowait())
+            batch, self._pending = rows, []
+            try:
+                await asyncio.shield(
+                    loop.run_in_executor(self._writer, self._write, batch))
+            except sqlite3.Error as err:
+                _LOGGER.error("Failed to write %s readings to %s: %s",
+                              len(batch), self._path, err)
+
+    def _open(self) -> None:
+        self._connection = sqlite3.connect(self._path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._table} "
+            "(mac TEXT, entity TEXT, timestamp INTEGER, value REAL)")
+        self._connection.commit()
+
+    def _write(self, rows: list[Row]) -> None:
+        assert self._connection is not None
+        start = time.perf_counter()
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT INTO {self._table} VALUES (?, ?, ?, ?)", rows)
+        self.write_seconds += time.perf_counter() - start
+        self.rows_written += len(rows)
+        self.batches_written += 1
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
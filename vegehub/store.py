@@ -0,0 +1,234 @@
+"""Append-only columnar storage for sensor samples.
+
+Every series (one entity on one hub) is kept as three flat files under
+``<root>/<mac>/``:
+
+* ``<entity>.ts``  - int64 timestamps (seconds since the epoch)
+* ``<entity>.val`` - float64 values
+* ``<entity>.idx`` - int64 timestamp of the first row of every block of
+  ``INDEX_STRIDE`` rows, used to narrow range queries before bisecting.
+
+Samples must be appended in time order. Range queries return memoryviews
+over memory-mapped column files, so no sample data is copied.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+import mmap
+import os
+from typing import Any
+
+from vegehub.helpers import update_data_to_ha_dict
+
+INDEX_STRIDE = 1024
+DEFAULT_BATCH_SIZE = 1024
+
+_EMPTY_TS: "memoryview[int]" = memoryview(b"").cast("q")
+_EMPTY_VAL: "memoryview[float]" = memoryview(b"").cast("d")
+
+
+class SampleStore():
+    """Per-hub, per-entity time series store backed by binary column files."""
+
+    def __init__(self, root: str, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self._root = root
+        self._batch_size = batch_size
+        self._pending: dict[tuple[str, str], tuple[array, array]] = {}
+        self._last: dict[tuple[str, str], int] = {}
+        self._index: dict[tuple[str, str], array] = {}
+        self._maps: dict[tuple[str, str], tuple[int, mmap.mmap, mmap.mmap]] = {}
+
+    @property
+    def root(self) -> str:
+        """Directory holding the column files."""
+        return self._root
+
+    def append(self, mac: str, entity: str, timestamp: int,
+               value: int | float) -> None:
+        """Queue one sample, flushing the series once a full batch is pending."""
+        key = (mac.lower(), entity)
+        last = self._last_timestamp(key)
+        if last is not None and timestamp < last:
+            raise ValueError(
+                f"Sample for {key[0]}/{entity} at {timestamp} is older than {last}")
+        self._last[key] = timestamp
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = (array("q"), array("d"))
+            self._pending[key] = pending
+        pending[0].append(timestamp)
+        pending[1].append(float(value))
+        if len(pending[0]) >= self._batch_size:
+            self._flush_series(key)
+
+    def append_ha_dict(self, mac: str, values: dict[str, Any],
+                       timestamp: int) -> None:
+        """Queue every numeric value of an update_data_to_ha_dict result."""
+        for entity, value in values.items():
+            if isinstance(value, (int, float)):
+                self.append(mac, entity, timestamp, value)
+
+    def append_update(self, data: dict[str, Any], num_sensors: int,
+                      num_actuators: int, is_ac: bool) -> None:
+        """Decode a raw update and queue its values, stamped with send_time."""
+        if "mac" not in data or "send_time" not in data:
+            return
+        values = update_data_to_ha_dict(data, num_sensors, num_actuators,
+                                        is_ac)
+        self.append_ha_dict(data["mac"], values, int(data["send_time"]))
+
+    def flush(self) -> None:
+        """Write every pending sample to disk."""
+        for key in list(self._pending):
+            self._flush_series(key)
+
+    def close(self) -> None:
+        """Flush pending samples and drop cached memory maps."""
+        self.flush()
+        self._maps.clear()
+        self._index.clear()
+
+    def __enter__(self) -> "SampleStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def series(self) -> list[tuple[str, str]]:
+        """List the (mac, entity) pairs that have data on disk or pending."""
+        found = set(self._pending)
+        if os.path.isdir(self._root):
+            for mac in os.listdir(self._root):
+                mac_dir = os.path.join(self._root, mac)
+                if not os.path.isdir(mac_dir):
+                    continue
+                for name in os.listdir(mac_dir):
+                    if name.endswith(".ts"):
+                        found.add((mac, name[:-3]))
+        return sorted(found)
+
+    def count(self, mac: str, entity: str) -> int:
+        """Number of samples stored for a series, including pending ones."""
+        key = (mac.lower(), entity)
+        pending = self._pending.get(key)
+        on_disk = 0
+        path = self._path(key, "ts")
+        if os.path.exists(path):
+            on_disk = os.path.getsize(path) // 8
+        return on_disk + (len(pending[0]) if pending else 0)
+
+    def query(self,
+              mac: str,
+              entity: str,
+              start: int | None = None,
+              end: int | None = None
+              ) -> tuple["memoryview[int]", "memoryview[float]"]:
+        """Return (timestamps, values) for samples with start <= t <= end.
+
+        Both results are memoryviews over the mapped column files. They stay
+        valid after further appends, but will not include them.
+        """
+        key = (mac.lower(), entity)
+        if key in self._pending:
+            self._flush_series(key)
+
+        mapped = self._map(key)
+        if mapped is None:
+            return _EMPTY_TS, _EMPTY_VAL
+        ts_view = memoryview(mapped[1]).cast("q")
+        val_view = memoryview(mapped[2]).cast("d")
+        rows = len(ts_view)
+
+        index = self._load_index(key)
+        low, high = 0, rows
+        if start is not None:
+            # The first match lies between the last block starting before
+            # start and the first block starting at or after it.
+            block = bisect_left(index, start)
+            low = bisect_left(ts_view, start,
+                              max(block - 1, 0) * INDEX_STRIDE,
+                              min(block * INDEX_STRIDE, rows))
+        if end is not None:
+            block = bisect_right(index, end)
+            high = min(block * INDEX_STRIDE, rows)
+            first = max((block - 1) * INDEX_STRIDE, low)
+            high = bisect_right(ts_view, end, first, high) if high > first else low
+        return ts_view[low:high], val_view[low:high]
+
+    def _path(self, key: tuple[str, str], suffix: str) -> str:
+        return os.path.join(self._root, key[0], f"{key[1]}.{suffix}")
+
+    def _last_timestamp(self, key: tuple[str, str]) -> int | None:
+        if key in self._last:
+            return self._last[key]
+        path = self._path(key, "ts")
+        if not os.path.exists(path) or os.path.getsize(path) < 8:
+            return None
+        with open(path, "rb") as ts_file:
+            ts_file.seek(-8, os.SEEK_END)
+            tail = array("q")
+            tail.frombytes(ts_file.read(8))
+        self._last[key] = tail[0]
+        return tail[0]
+
+    def _load_index(self, key: tuple[str, str]) -> array:
+        index = self._index.get(key)
+        if index is None:
+            index = array("q")
+            path = self._path(key, "idx")
+            if os.path.exists(path):
+                with open(path, "rb") as idx_file:
+                    index.frombytes(idx_file.read())
+            self._index[key] = index
+        return index
+
+    def _flush_series(self, key: tuple[str, str]) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None or not pending[0]:
+            return
+        timestamps, values = pending
+        os.makedirs(os.path.join(self._root, key[0]), exist_ok=True)
+
+        ts_path = self._path(key, "ts")
+        rows = os.path.getsize(ts_path) // 8 if os.path.exists(ts_path) else 0
+
+        # Record the first timestamp of every block this batch starts.
+        index = self._load_index(key)
+        new_index = array("q")
+        first_block = -(-rows // INDEX_STRIDE)
+        for row in range(first_block * INDEX_STRIDE, rows + len(timestamps),
+                         INDEX_STRIDE):
+            new_index.append(timestamps[row - rows])
+
+        with open(ts_path, "ab") as ts_file:
+            timestamps.tofile(ts_file)
+        with open(self._path(key, "val"), "ab") as val_file:
+            values.tofile(val_file)
+        if new_index:
+            with open(self._path(key, "idx"), "ab") as idx_file:
+                new_index.tofile(idx_file)
+            index.extend(new_index)
+
+    def _map(self,
+             key: tuple[str, str]) -> tuple[int, mmap.mmap, mmap.mmap] | None:
+        ts_path = self._path(key, "ts")
+        if not os.path.exists(ts_path):
+            return None
+        size = os.path.getsize(ts_path)
+        if size == 0:
+            return None
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == size:
+            return cached
+
+        # Older maps are left to the garbage collector, since views handed
+        # out by earlier queries may still reference them.
+        with open(ts_path, "rb") as ts_file, open(self._path(key, "val"),
+                                                  "rb") as val_file:
+            ts_map = mmap.mmap(ts_file.fileno(), size, access=mmap.ACCESS_READ)
+            val_map = mmap.mmap(val_file.fileno(),
+                                size,
+                                access=mmap.ACCESS_READ)
+        mapped = (size, ts_map, val_map)
+        self._maps[key] = mapped
+        return mapped
@@ -0,0 +1,202 @@
+"""Transports that carry VegeHub API requests to a hub.
+
+VegeHub sends every request through a Transport. AiohttpTransport talks to
+real hubs over HTTP. InProcessTransport hands requests straight to Python
+handlers, so thousands of simulated hubs can run in one process without
+any sockets.
+"""
+from abc import ABC, abstractmethod
+import asyncio
+import copy
+import inspect
+from collections.abc import Awaitable, Callable
+from typing import Any, Protocol
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from vegehub import profiling
+
+METHOD_GET = "GET"
+METHOD_POST = "POST"
+
+HandlerResult = tuple[int, Any]
+Handler = Callable[[str, str, Any], HandlerResult | Awaitable[HandlerResult]]
+
+
+class Response(Protocol):
+    """The parts of a response that VegeHub reads."""
+
+    status: int
+
+    async def json(self) -> Any:
+        """The decoded JSON body."""
+
+
+class Transport(ABC):
+    """Send one request to a hub and return its response."""
+
+    @abstractmethod
+    async def request(self,
+                      method: str,
+                      url: str,
+                      payload: Any = None) -> Response:
+        """Send `payload` as JSON (POST) or nothing (GET) to `url`."""
+
+    async def close(self) -> None:
+        """Release anything held by the transport."""
+
+
+class AiohttpTransport(Transport):
+    """Send requests over HTTP with aiohttp.
+
+    Without a session, each request opens and closes its own, as hubs are
+    usually contacted rarely. Pass a session to reuse its connections.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession | None = None) -> None:
+        self._session = session
+
+    async def request(self,
+                      method: str,
+                      url: str,
+                      payload: Any = None) -> Response:
+        if self._session is not None:
+            return await self._send(self._session, method, url, payload)
+        with profiling.stage("http.session"):
+            session = aiohttp.ClientSession()
+        try:
+            return await self._send(session, method, url, payload)
+        finally:
+            with profiling.stage("http.session"):
+                await session.close()
+
+    @staticmethod
+    @profiling.timed("http.request")
+    async def _send(session: aiohttp.ClientSession, method: str, url: str,
+                    payload: Any) -> aiohttp.ClientResponse:
+        if method == METHOD_GET:
+            response = await session.get(url)
+        else:
+            response = await session.post(url, json=payload)
+        # Read the body now, so it stays available once the session closes.
+        await response.read()
+        return response
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+class InProcessResponse():
+    """A response produced by an in-process handler."""
+
+    __slots__ = ("status", "_data")
+
+    def __init__(self, status: int, data: Any = None) -> None:
+        self.status = status
+        self._data = data
+
+    async def json(self) -> Any:
+        """The handler's result, as aiohttp would have decoded it."""
+        return self._data
+
+
+class InProcessTransport(Transport):
+    """Dispatch requests to Python handlers registered per host.
+
+    A handler is called with (method, path, payload) and returns, or
+    resolves to, (status, data). Requests to unknown hosts raise OSError,
+    as aiohttp does when nothing answers. `latency` adds a delay to
+    every request.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self._handlers: dict[str, Handler] = {}
+        self.latency = latency
+        self.requests = 0
+
+    def add_host(self, host: str, handler: Handler) -> None:
+        """Route requests for `host` to `handler`."""
+        self._handlers[host] = handler
+
+    def remove_host(self, host: str) -> None:
+        """Stop answering requests for `host`."""
+        self._handlers.pop(host, None)
+
+    async def request(self,
+                      method: str,
+                      url: str,
+                      payload: Any = None) -> Response:
+        parts = urlsplit(url)
+        handler = self._handlers.get(parts.netloc)
+        if handler is None:
+            raise OSError(f"No handler for {parts.netloc}")
+        self.requests += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        result = handler(method, parts.path, payload)
+        if inspect.isawaitable(result):
+            result = await result
+        status, data = result
+        return InProcessResponse(status, data)
+
+
+class SimulatedHub():
+    """A handler for InProcessTransport that behaves like a VegeHub.
+
+    It answers the info, config, actuator and update endpoints, keeps the
+    config and actuator states it is sent, and counts update requests.
+    """
+
+    def __init__(self,
+                 mac_address: str,
+                 num_sensors: int = 4,
+                 num_actuators: int = 2,
+                 is_ac: bool = False,
+                 sw_version: str = "3.4.5") -> None:
+        self.mac_address = mac_address
+        self.info: dict[str, Any] = {
+            "num_channels": num_sensors,
+            "num_actuators": num_actuators,
+            "version": sw_version,
+            "is_ac": int(is_ac),
+            "batt_v": 9.0,
+        }
+        self.config: dict[str, Any] = {
+            "hub": {"server_url": "", "server_type": 0},
+            "api_key": "",
+        }
+        self.actuators: list[dict[str, Any]] = [{
+            "slot": slot,
+            "state": 0,
+            "duration": 0
+        } for slot in range(num_actuators)]
+        self.update_requests = 0
+
+    def __call__(self, method: str, path: str, payload: Any) -> HandlerResult:
+        if path == "/api/info/get":
+            return 200, {
+                "wifi": {"mac_addr": self.mac_address},
+                "hub": dict(self.info),
+            }
+        if path == "/api/config/get":
+            return 200, copy.deepcopy(self.config)
+        if path == "/api/config/set":
+            if not isinstance(payload, dict):
+                return 400, None
+            self.config = copy.deepcopy(payload)
+            return 200, None
+        if path == "/api/actuators/status":
+            return 200, {"actuators": [dict(a) for a in self.actuators]}
+        if path == "/api/actuators/set":
+            slot = payload.get("target") if isinstance(payload, dict) else None
+            if not isinstance(slot, int) or not 0 <= slot < len(self.actuators):
+                return 400, None
+            self.actuators[slot].update(state=payload.get("state", 0),
+                                        duration=payload.get("duration", 0))
+            return 200, None
+        if path == "/api/update/send" and method == METHOD_GET:
+            self.update_requests += 1
+            return 200, None
+        return 404, None
@@ -1,10 +1,44 @@
 """VegeHub API access library."""
 
+import asyncio
 import logging
 from typing import Any
 import aiohttp
 
+from vegehub import profiling
+from vegehub.failure_log import FailureLog
+from vegehub.models import ActuatorStatus, HubConfig, HubInfo
+from vegehub.request_queue import (PRIORITY_COMMAND, PRIORITY_CONFIG,
+                                   PRIORITY_POLL, RequestQueue)
+from vegehub.sensors import SENSOR_RAW, SensorPipeline, get_sensor_transform
+from vegehub.transport import (METHOD_GET, METHOD_POST, AiohttpTransport,
+                               Response, Transport)
+from vegehub.watch import (DEFAULT_BUFFER_SIZE, OVERFLOW_DROP_OLDEST,
+                           HubWatcher, ReadingBuffer, make_reading,
+                           watch_hubs)
+
 _LOGGER = logging.getLogger(__name__)
+_FAILURES = FailureLog(_LOGGER)
+_DEFAULT_TRANSPORT = AiohttpTransport()
+
+
+@profiling.timed("json")
+async def _read_json(response: Response) -> Any:
+    """Decode a response body, timed as the "json" profiling stage."""
+    return await response.json()
+
+
+class _PendingActuatorCommand():
+    """The latest state requested for a slot during its coalesce window."""
+
+    __slots__ = ("future", "task", "state", "duration", "retries")
+
+    def __init__(self, future: asyncio.Future) -> None:
+        self.future = future
+        self.task: asyncio.Task | None = None
+        self.state = 0
+        self.duration = 0
+        self.retries = 0
 
 
 class VegeHub():
@@ -14,12 +48,29 @@ class VegeHub():
                  ip_address: str,
                  mac_address: str = "",
                  unique_id: str = "",
-                 info: dict[Any, Any] | None = None) -> None:
+                 info: dict[Any, Any] | None = None,
+                 sensor_types: dict[int, str] | None = None,
+                 concurrency: int = 1,
+                 coalesce_window: float = 0.0,
+                 transport: Transport | None = None) -> None:
         self._ip_address: str = ip_address
+        self._transport: Transport = transport or _DEFAULT_TRANSPORT
         self._mac_address: str = mac_address
         self._unique_id: str = unique_id
-        self._info = info
+        self._info: dict[Any, Any] | None = None
+        self._hub_info: HubInfo | None = None
+        self._sensor_types: dict[int, str] = {}
+        self._pipeline: SensorPipeline | None = None
+        self._set_info(info)
+        self._queue = RequestQueue(concurrency)
+        self._coalesce_window = coalesce_window
+        self._coalesce_windows: dict[int, float] = {}
+        self._pending_commands: dict[int, _PendingActuatorCommand] = {}
+        self.coalesced_commands = 0
+        self._watchers: set[ReadingBuffer] = set()
         self.entities: dict[Any, Any] = {}
+        for index, sensor_type in (sensor_types or {}).items():
+            self.set_sensor_type(index, sensor_type)
 
     @property
     def ip_address(self) -> str:
@@ -41,39 +92,134 @@ class VegeHub():
         """Property to retrieve a URL to reach this hub."""
         return f"http://{self._ip_address}"
 
+    @property
+    def transport(self) -> Transport:
+        """Property to retrieve the transport requests are sent through."""
+        return self._transport
+
     @property
     def info(self) -> dict | None:
         """Property to retrieve hub info."""
         return self._info
 
+    @property
+    def hub_info(self) -> HubInfo | None:
+        """Property to retrieve hub info parsed into a HubInfo."""
+        return self._hub_info
+
     @property
     def num_sensors(self) -> int | None:
         """The number of sensors channels on this hub."""
-        if self._info:
-            return int(self._info["num_channels"] or 0)
+        if self._hub_info:
+            return self._hub_info.num_sensors
         return None
 
     @property
     def num_actuators(self) -> int | None:
         """The number of actuator channels on this hub."""
-        if self._info:
-            return int(self._info["num_actuators"] or 0)
+        if self._hub_info:
+            return self._hub_info.num_actuators
         return None
 
     @property
     def sw_version(self) -> str | None:
         """Property to retrieve the version of the software running on this hub."""
-        if self._info:
-            return self._info["version"]
+        if self._hub_info:
+            return self._hub_info.sw_version
         return None
 
     @property
     def is_ac(self) -> bool | None:
         """Property to return whether or not this is an AC powered hub."""
-        if self._info:
-            return bool(self._info["is_ac"])
+        if self._hub_info:
+            return self._hub_info.is_ac
         return None
 
+    def _set_info(self, info: dict[Any, Any] | None) -> None:
+        """Store new hub info, parsing it once and invalidating the pipeline.
+
+        Raises ValueError, leaving the stored info as it was, if the info
+        cannot be parsed.
+        """
+        hub_info = HubInfo.from_dict(info) if info else None
+        self._info = info
+        self._hub_info = hub_info
+        self._pipeline = None
+
+    @property
+    def queue_metrics(self) -> dict[str, Any]:
+        """Depth and wait time statistics for requests sent to this hub."""
+        return self._queue.metrics
+
+    @property
+    def failure_counts(self) -> dict[str, int]:
+        """Number of failed requests to this hub, per API endpoint."""
+        return _FAILURES.hub_counts(self._ip_address)
+
+    def request_latency(self, percentile: float = 95) -> float | None:
+        """Recent request latency to this hub at the given percentile, in seconds."""
+        return self._queue.latency_percentile(percentile)
+
+    @property
+    def sensor_types(self) -> dict[int, str]:
+        """The configured probe type of each analog channel, by channel index."""
+        return dict(self._sensor_types)
+
+    def set_sensor_type(self, index: int, sensor_type: str) -> None:
+        """Set the probe type of analog channel `index` (analog_<index>)."""
+        get_sensor_transform(sensor_type)  # Raises KeyError if unknown
+        if sensor_type == SENSOR_RAW:
+            self._sensor_types.pop(index, None)
+        else:
+            self._sensor_types[index] = sensor_type
+        self._pipeline = None
+
+    @property
+    def pipeline(self) -> SensorPipeline | None:
+        """Decode pipeline for this hub, compiled once the hub info is known."""
+        if self._pipeline is None and self._hub_info:
+            self._pipeline = SensorPipeline(self._hub_info.num_sensors,
+                                            self._hub_info.num_actuators,
+                                            self._hub_info.is_ac,
+                                            self._sensor_types)
+        return self._pipeline
+
+    def decode_update(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Decode a raw update into final values using the configured probe types."""
+        pipeline = self.pipeline
+        if pipeline is None:
+            return {}
+        return pipeline.decode(data)
+
+    def add_watcher(self, buffer: ReadingBuffer) -> None:
+        """Deliver readings pushed to this hub into `buffer`."""
+        self._watchers.add(buffer)
+
+    def remove_watcher(self, buffer: ReadingBuffer) -> None:
+        """Stop delivering readings into `buffer`."""
+        self._watchers.discard(buffer)
+
+    async def handle_push(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Decode an update pushed by this hub and hand it to any watchers."""
+        values = self.decode_update(data)
+        if self._watchers:
+            reading = make_reading(self._mac_address or data.get("mac", ""),
+                                   values, data)
+            for buffer in list(self._watchers):
+                await buffer.put(reading)
+        return values
+
+    def watch(self,
+              maxsize: int = DEFAULT_BUFFER_SIZE,
+              overflow: str = OVERFLOW_DROP_OLDEST,
+              poll_interval: float | None = None) -> HubWatcher:
+        """Iterate over readings from this hub as they arrive.
+
+        Readings come from updates passed to handle_push. With a
+        poll_interval, the hub is also asked to send an update that often.
+        """
+        return watch_hubs([self], maxsize, overflow, poll_interval)
+
     async def request_update(self) -> bool:
         """Request an update of data from the Hub."""
         return await self._request_update()
@@ -98,12 +244,65 @@ class VegeHub():
             retries -= 1
         return ret
 
+    def set_coalesce_window(self, seconds: float, slot: int | None = None) -> None:
+        """Collapse actuator commands sent within `seconds` of each other.
+
+        Applies to every slot, or only to `slot` if given. A window of 0
+        sends every command immediately.
+        """
+        if slot is None:
+            self._coalesce_window = seconds
+        else:
+            self._coalesce_windows[slot] = seconds
+
     async def set_actuator(self,
                            state: int,
                            slot: int,
                            duration: int,
                            retries: int = 0) -> bool:
-        """Set the target actuator to the target state for the intended duration."""
+        """Set the target actuator to the target state for the intended duration.
+
+        If a coalesce window is set for the slot, commands arriving within
+        the window are collapsed into the last one, and every caller gets the
+        outcome of the command that was actually sent.
+        """
+        window = self._coalesce_windows.get(slot, self._coalesce_window)
+        if window <= 0:
+            return await self._set_actuator_with_retries(
+                state, slot, duration, retries)
+
+        pending = self._pending_commands.get(slot)
+        if pending is None:
+            pending = _PendingActuatorCommand(
+                asyncio.get_running_loop().create_future())
+            self._pending_commands[slot] = pending
+            pending.task = asyncio.create_task(
+                self._send_coalesced_actuator(slot, window))
+        else:
+            self.coalesced_commands += 1
+        pending.state = state
+        pending.duration = duration
+        pending.retries = retries
+        return await asyncio.shield(pending.future)
+
+    async def _send_coalesced_actuator(self, slot: int, window: float) -> None:
+        """Wait out the coalesce window, then send the last requested state."""
+        await asyncio.sleep(window)
+        pending = self._pending_commands.pop(slot)
+        try:
+            result = await self._set_actuator_with_retries(
+                pending.state, slot, pending.duration, pending.retries)
+        except Exception as err:  # pylint: disable=broad-except
+            pending.future.set_exception(err)
+        else:
+            pending.future.set_result(result)
+
+    async def _set_actuator_with_retries(self,
+                                         state: int,
+                                         slot: int,
+                                         duration: int,
+                                         retries: int = 0) -> bool:
+        """Run the _set_actuator function, but retry on failures if retries > 0."""
         while True:
             try:
                 await self._set_actuator(state, slot, duration)
@@ -131,6 +330,30 @@ class VegeHub():
             break  # If we reach this point without an exception, it has succeeded
         return ret
 
+    async def actuator_status(self, retries: int = 0) -> list[ActuatorStatus]:
+        """Grab the states of all actuators on the Hub as ActuatorStatus models."""
+        return [
+            ActuatorStatus.from_dict(actuator)
+            for actuator in await self.actuator_states(retries)
+        ]
+
+    async def get_info(self, retries: int = 0) -> dict | None:
+        """Fetch the hub info from the Hub, store it, and return it."""
+        await self._get_device_info_with_retries(retries)
+        return self._info
+
+    async def get_config(self, retries: int = 0) -> dict | None:
+        """Fetch the current configuration from the Hub and return it."""
+        return await self._get_device_config_with_retries(retries)
+
+    async def get_hub_config(self, retries: int = 0) -> HubConfig | None:
+        """Fetch the current configuration from the Hub as a HubConfig.
+
+        Raises ValueError if the configuration has no hub section.
+        """
+        config = await self._get_device_config_with_retries(retries)
+        return HubConfig.from_dict(config) if config else None
+
     async def setup(self,
                     api_key: str,
                     server_address: str,
@@ -154,30 +377,33 @@ class VegeHub():
         url = f"http://{self._ip_address}/api/info/get"
 
         payload: dict[Any, Any] = {"hub": [], "wifi": []}
-        session = aiohttp.ClientSession()
         try:
-            response = await session.post(url, json=payload)
-            if response.status != 200:
-                _LOGGER.error("Failed to get config from %s: HTTP %s", url,
-                              response.status)
-                raise ConnectionError
-
-            # Parse the response JSON
-            info_data = await response.json()
-            if info_data:
-                if "wifi" in info_data and not self._mac_address:
-                    self._mac_address = (info_data.get(
-                        "wifi", {}).get("mac_addr").replace(":", "").upper())
-                if "hub" in info_data:
-                    _LOGGER.info("Received info from %s", self._ip_address)
-                    return info_data["hub"]
-            return None
+            async with self._queue.slot(PRIORITY_POLL):
+                response = await self._transport.request(METHOD_POST, url,
+                                                        payload)
+                if response.status != 200:
+                    _FAILURES.error(self._ip_address, "/api/info/get",
+                                    "Failed to get config from %s: HTTP %s",
+                                    url, response.status)
+                    raise ConnectionError
+
+                # Parse the response JSON
+                info_data = await _read_json(response)
+                if info_data:
+                    if "wifi" in info_data and not self._mac_address:
+                        self._mac_address = (info_data.get(
+                            "wifi", {}).get("mac_addr").replace(":", "").upper())
+                    if "hub" in info_data:
+                        _LOGGER.info("Received info from %s", self._ip_address)
+                        return info_data["hub"]
+                return None
+        except ConnectionError:
+            raise
         except (aiohttp.ClientConnectorError, Exception) as err:
-            _LOGGER.error("Connection error getting info from %s: %s", url,
-                          err)
+            _FAILURES.error(self._ip_address, "/api/info/get",
+                            "Connection error getting info from %s: %s",
+                            url, err)
             raise ConnectionError from err
-        finally:
-            await session.close()
 
     async def _get_device_config(self) -> dict | None:
         """Fetch the current configuration from the device."""
@@ -185,22 +411,25 @@ class VegeHub():
 
         payload: dict[Any, Any] = {"hub": [], "api_key": []}
 
-        session = aiohttp.ClientSession()
         try:
-            response = await session.post(url, json=payload)
-            if response.status != 200:
-                _LOGGER.error("Failed to get config from %s: HTTP %s", url,
-                              response.status)
-                raise ConnectionError
-
-            # Parse the response JSON
-            return await response.json()
+            async with self._queue.slot(PRIORITY_CONFIG):
+                response = await self._transport.request(METHOD_POST, url,
+                                                        payload)
+                if response.status != 200:
+                    _FAILURES.error(self._ip_address, "/api/config/get",
+                                    "Failed to get config from %s: HTTP %s",
+                                    url, response.status)
+                    raise ConnectionError
+
+                # Parse the response JSON
+                return await _read_json(response)
+        except ConnectionError:
+            raise
         except (aiohttp.ClientConnectorError, Exception) as err:
-            _LOGGER.error("Connection error getting config from %s: %s", url,
-                          err)
+            _FAILURES.error(self._ip_address, "/api/config/get",
+                            "Connection error getting config from %s: %s",
+                            url, err)
             raise ConnectionError from err
-        finally:
-            await session.close()
 
     def _modify_device_config(self, config_data: dict | None, new_key: str,
                               server_url: str) -> dict | None:
@@ -234,20 +463,22 @@ class VegeHub():
         if config_data is None:
             return False
 
-        session = aiohttp.ClientSession()
-
         try:
-            response = await session.post(url, json=config_data)
-            if response.status != 200:
-                _LOGGER.error("Failed to set config at %s: HTTP %s", url,
-                              response.status)
-                raise ConnectionError
+            async with self._queue.slot(PRIORITY_CONFIG):
+                response = await self._transport.request(METHOD_POST, url,
+                                                        config_data)
+                if response.status != 200:
+                    _FAILURES.error(self._ip_address, "/api/config/set",
+                                    "Failed to set config at %s: HTTP %s",
+                                    url, response.status)
+                    raise ConnectionError
+        except ConnectionError:
+            raise
         except (aiohttp.ClientConnectorError, Exception) as err:
-            _LOGGER.error("Connection error setting config on %s: %s", url,
-                          err)
+            _FAILURES.error(self._ip_address, "/api/config/set",
+                            "Connection error setting config on %s: %s",
+                            url, err)
             raise ConnectionError from err
-        finally:
-            await session.close()
         return True
 
     async def _get_device_config_with_retries(self,
@@ -298,7 +529,14 @@ class VegeHub():
         """Run the _get_device_info function, but retry on failures if retries > 0."""
         while True:
             try:
-                self._info = await self._get_device_info()
+                info = await self._get_device_info()
+                try:
+                    self._set_info(info)
+                except ValueError as err:
+                    _FAILURES.error(self._ip_address, "/api/info/get",
+                                    "Invalid info from %s: %s",
+                                    self._ip_address, err)
+                    raise ConnectionError from err
             except (ConnectionError, TimeoutError):
                 if retries <= 0:
                     raise
@@ -316,21 +554,21 @@ class VegeHub():
     async def _request_update(self) -> bool:
         """Ask the device to send in a full update of data to Home Assistant."""
         url = f"http://{self._ip_address}/api/update/send"
-        session = aiohttp.ClientSession()
-
         try:
-            response = await session.get(url)
-            if response.status != 200:
-                _LOGGER.error("Failed to ask for update from %s: HTTP %s", url,
-                              response.status)
-                raise ConnectionError
+            async with self._queue.slot(PRIORITY_CONFIG):
+                response = await self._transport.request(METHOD_GET, url)
+                if response.status != 200:
+                    _FAILURES.error(self._ip_address, "/api/update/send",
+                                    "Failed to ask for update from %s: HTTP %s",
+                                    url, response.status)
+                    raise ConnectionError
+        except ConnectionError:
+            raise
         except (aiohttp.ClientConnectorError, Exception) as err:
-            _LOGGER.error(
-                "Connection error while requesting update from %s: %s", url,
-                err)
+            _FAILURES.error(self._ip_address, "/api/update/send",
+                            "Connection error while requesting update from %s: %s",
+                            url, err)
             raise ConnectionError from err
-        finally:
-            await session.close()
 
         return True
 
@@ -340,31 +578,34 @@ class VegeHub():
 
         # Prepare the JSON payload for the POST request
         payload: dict[Any, Any] = {"wifi": []}
-        session = aiohttp.ClientSession()
 
-        # Use aiohttp to send the POST request with the JSON body
+        # Send the request with the JSON body
         try:
-            response = await session.post(url, json=payload)
-            if response.status != 200:
-                _LOGGER.error("Failed to get config from %s: HTTP %s", url,
-                              response.status)
-                raise ConnectionError
-            # Parse the JSON response
-            config_data = await response.json()
-            mac_address = config_data.get("wifi", {}).get("mac_addr")
-            if not mac_address:
-                _LOGGER.error(
-                    "MAC address not found in the config response from %s",
-                    self._ip_address)
-                return False
-            _LOGGER.info("%s MAC address: %s", self._ip_address, mac_address)
-            self._mac_address = mac_address.replace(":", "").upper()
+            async with self._queue.slot(PRIORITY_POLL):
+                response = await self._transport.request(METHOD_POST, url,
+                                                        payload)
+                if response.status != 200:
+                    _FAILURES.error(self._ip_address, "/api/info/get",
+                                    "Failed to get config from %s: HTTP %s",
+                                    url, response.status)
+                    raise ConnectionError
+                # Parse the JSON response
+                config_data = await _read_json(response)
+                mac_address = config_data.get("wifi", {}).get("mac_addr")
+                if not mac_address:
+                    _FAILURES.error(self._ip_address, "/api/info/get",
+                                    "MAC address not found in the config response from %s",
+                                    self._ip_address)
+                    return False
+                _LOGGER.info("%s MAC address: %s", self._ip_address, mac_address)
+                self._mac_address = mac_address.replace(":", "").upper()
+        except ConnectionError:
+            raise
         except (aiohttp.ClientConnectorError, Exception) as err:
-            _LOGGER.error("Connection error getting mac address from %s: %s",
-                          url, err)
+            _FAILURES.error(self._ip_address, "/api/info/get",
+                            "Connection error getting mac address from %s: %s",
+                            url, err)
             raise ConnectionError from err
-        finally:
-            await session.close()
         return True
 
     async def _set_actuator(self, state: int, slot: int,
@@ -379,54 +620,52 @@ class VegeHub():
             "state": state,
         }
 
-        session = aiohttp.ClientSession()
-
-        # Use aiohttp to send the POST request with the JSON body
+        # Send the request with the JSON body
         try:
-            response = await session.post(url, json=payload)
-            if response.status != 200:
-                _LOGGER.error(
-                    "Failed to set actuator state on %s: HTTP %s",
-                    url,
-                    response.status,
-                )
-                raise ConnectionError
-            return True
+            async with self._queue.slot(PRIORITY_COMMAND):
+                response = await self._transport.request(METHOD_POST, url,
+                                                        payload)
+                if response.status != 200:
+                    _FAILURES.error(self._ip_address, "/api/actuators/set",
+                                    "Failed to set actuator state on %s: HTTP %s",
+                                    url, response.status)
+                    raise ConnectionError
+                return True
+        except ConnectionError:
+            raise
         except (aiohttp.ClientConnectorError, Exception) as err:
-            _LOGGER.error("Connection error setting actuator on %s: %s", url,
-                          err)
+            _FAILURES.error(self._ip_address, "/api/actuators/set",
+                            "Connection error setting actuator on %s: %s",
+                            url, err)
             raise ConnectionError from err
-        finally:
-            await session.close()
 
     async def _get_actuator_info(self) -> list:
         """Fetch the current status of the actuators."""
         url = f"http://{self._ip_address}/api/actuators/status"
         _LOGGER.info("Retrieving actuator status from %s", self._ip_address)
-        session = aiohttp.ClientSession()
 
-        # Use aiohttp to send the POST request with the JSON body
         try:
-            response = await session.get(url)
-            if response.status != 200:
-                _LOGGER.error("Failed to get status from %s: HTTP %s", url,
-                              response.status)
-                raise ConnectionError
-
-            # Parse the JSON response
-            config_data = await response.json()
-            actuators = config_data.get("actuators", [])
-            if not actuators:
-                _LOGGER.error(
-                    "Actuator information not found in response from %s",
-                    self._ip_address)
-                raise AttributeError
-            return actuators
-        except AttributeError:
+            async with self._queue.slot(PRIORITY_POLL):
+                response = await self._transport.request(METHOD_GET, url)
+                if response.status != 200:
+                    _FAILURES.error(self._ip_address, "/api/actuators/status",
+                                    "Failed to get status from %s: HTTP %s",
+                                    url, response.status)
+                    raise ConnectionError
+
+                # Parse the JSON response
+                config_data = await _read_json(response)
+                actuators = config_data.get("actuators", [])
+                if not actuators:
+                    _FAILURES.error(self._ip_address, "/api/actuators/status",
+                                    "Actuator information not found in response from %s",
+                                    self._ip_address)
+                    raise AttributeError
+                return actuators
+        except (AttributeError, ConnectionError):
             raise
         except (aiohttp.ClientConnectorError, Exception) as err:
-            _LOGGER.error("Connection error getting actuator info from %s: %s",
-                          url, err)
+            _FAILURES.error(self._ip_address, "/api/actuators/status",
+                            "Connection error getting actuator info from %s: %s",
+                            url, err)
             raise ConnectionError from err
-        finally:
-            await session.close()
@@ -0,0 +1,183 @@
+"""Streaming of decoded readings from one or more hubs."""
+import asyncio
+from collections import deque
+from collections.abc import Iterable
+import contextlib
+import logging
+import time
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from vegehub.vegehub import VegeHub
+
+_LOGGER = logging.getLogger(__name__)
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_BLOCK = "block"
+DEFAULT_BUFFER_SIZE = 100
+
+
+class Reading():
+    """One decoded update received from a hub."""
+
+    __slots__ = ("mac", "values", "send_time", "received", "raw")
+
+    def __init__(self, mac: str, values: dict[str, Any],
+                 send_time: int | None, received: float,
+                 raw: dict[str, Any]) -> None:
+        self.mac = mac
+        self.values = values
+        self.send_time = send_time
+        self.received = received
+        self.raw = raw
+
+    def __repr__(self) -> str:
+        return f"Reading(mac={self.mac!r}, values={self.values!r})"
+
+
+class ReadingBuffer():
+    """Bounded buffer between hubs producing readings and one consumer.
+
+    When full, the drop_oldest policy discards the oldest reading, while the
+    block policy makes producers wait for the consumer to catch up. Once
+    closed, the buffer drops new readings and releases waiting producers.
+    """
+
+    def __init__(self,
+                 maxsize: int = DEFAULT_BUFFER_SIZE,
+                 overflow: str = OVERFLOW_DROP_OLDEST) -> None:
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self.closed = False
+        self._items: deque[Reading] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def put(self, reading: Reading) -> None:
+        """Add a reading, applying the overflow policy if the buffer is full."""
+        if self.overflow == OVERFLOW_BLOCK:
+            while len(self._items) >= self.maxsize and not self.closed:
+                self._not_full.clear()
+                await self._not_full.wait()
+        if self.closed:
+            self.dropped += 1
+            return
+        if len(self._items) >= self.maxsize:
+            self._items.popleft()
+            self.dropped += 1
+        self._items.append(reading)
+        self._not_empty.set()
+
+    async def get(self) -> Reading:
+        """Wait for and remove the oldest reading."""
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        reading = self._items.popleft()
+        self._not_full.set()
+        return reading
+
+    def close(self) -> None:
+        """Drop any further readings and release producers waiting for room."""
+        self.closed = True
+        self._not_full.set()
+
+
+async def _poll(hub: "VegeHub", interval: float) -> None:
+    """Ask a hub to push an update every `interval` seconds."""
+    while True:
+        try:
+            await hub.request_update()
+        except ConnectionError:
+            _LOGGER.debug("Polling %s for an update failed", hub.ip_address)
+        await asyncio.sleep(interval)
+
+
+class HubWatcher():
+    """Async iterator over readings pushed to any of a set of hubs.
+
+    The buffer is attached to the hubs when the watcher is created, so
+    readings pushed before iteration starts are not lost. It is detached by
+    aclose(), by leaving an `async with` block, or if iteration is
+    cancelled.
+    """
+
+    def __init__(self,
+                 hubs: Iterable["VegeHub"],
+                 maxsize: int = DEFAULT_BUFFER_SIZE,
+                 overflow: str = OVERFLOW_DROP_OLDEST,
+                 poll_interval: float | None = None) -> None:
+        self._hubs = list(hubs)
+        self.buffer = ReadingBuffer(maxsize, overflow)
+        self._polls: list[asyncio.Task] = []
+        self._closed = False
+        for hub in self._hubs:
+            hub.add_watcher(self.buffer)
+            if poll_interval is not None:
+                self._polls.append(
+                    asyncio.create_task(_poll(hub, poll_interval)))
+
+    def __aiter__(self) -> "HubWatcher":
+        return self
+
+    async def __anext__(self) -> Reading:
+        if self._closed:
+            raise StopAsyncIteration
+        try:
+            return await self.buffer.get()
+        except asyncio.CancelledError:
+            self._detach()
+            raise
+
+    async def __aenter__(self) -> "HubWatcher":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop watching: detach from the hubs and stop polling."""
+        self._detach()
+        if self._polls:
+            await asyncio.gather(*self._polls, return_exceptions=True)
+
+    def _detach(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for hub in self._hubs:
+            hub.remove_watcher(self.buffer)
+        self.buffer.close()
+        for poll in self._polls:
+            poll.cancel()
+
+    def __del__(self) -> None:
+        # Like an abandoned async generator, detach once garbage collected.
+        with contextlib.suppress(RuntimeError):
+            self._detach()
+
+
+def watch_hubs(hubs: Iterable["VegeHub"],
+               maxsize: int = DEFAULT_BUFFER_SIZE,
+               overflow: str = OVERFLOW_DROP_OLDEST,
+               poll_interval: float | None = None) -> HubWatcher:
+    """Watch for readings pushed to any of `hubs`, starting immediately.
+
+    Readings are fed in through VegeHub.handle_push. With a poll_interval,
+    each hub is also asked to push an update that often, which needs a
+    running event loop.
+    """
+    return HubWatcher(hubs, maxsize, overflow, poll_interval)
+
+
+def make_reading(mac: str, values: dict[str, Any],
+                 data: dict[str, Any]) -> Reading:
+    """Wrap decoded values from a raw update in a Reading."""
+    return Reading(mac, values, data.get("send_time"), time.time(), data)